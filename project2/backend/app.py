@@ -4,20 +4,24 @@ warnings.filterwarnings("ignore", message="Thread 'MainThread': missing ScriptRu
 
 import os
 import json
+import time
+import uuid
 import logging
+import threading
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 
 import pandas as pd
 import yfinance as yf
-import numpy as np
 
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense
-
-from utils.predictor import prepare_new_data, predict_next_30
+from utils.price_store import PriceStore
+from utils.admission import AdmissionController, RateLimiter, Rejected
+from utils.scheduler import plan_training
+from utils.training_pool import TrainingPool
+from utils.encoding import JSON, offered_types, encode, compress
 
 # --- logging ---
 logging.basicConfig(level=logging.INFO)
@@ -28,6 +32,7 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 USERS_FILE = os.path.join(DATA_DIR, "users.json")
 HISTORY_FILE = os.path.join(DATA_DIR, "history.json")
+PRICES_DIR = os.path.join(DATA_DIR, "prices")
 
 os.makedirs(DATA_DIR, exist_ok=True)
 for f in (USERS_FILE, HISTORY_FILE):
@@ -38,6 +43,52 @@ for f in (USERS_FILE, HISTORY_FILE):
 app = Flask(__name__)
 CORS(app)
 
+# shared memory-mapped price history; /predict reads from it and only
+# downloads the days it is missing
+PRICE_REFRESH = 3600
+price_store = PriceStore(PRICES_DIR)
+price_checked = {}      # ticker -> time of the last stored download
+price_inflight = {}     # ticker -> Event set when its running download finishes
+price_checked_lock = threading.Lock()
+
+history_lock = threading.Lock()
+
+# --- CPU scheduling: how many trainings run at once and how many cores each gets ---
+# PREDICT_POLICY=throughput|latency; PREDICT_WORKERS caps concurrent jobs.
+# Each job trains in its own worker process pinned to its share of the cores;
+# the jobs table, caches and admission control live in this one process, so
+# run the backend as a single server process (python app.py).
+training_plan = plan_training(os.environ.get("PREDICT_POLICY", "latency"),
+                              max_jobs=int(os.environ.get("PREDICT_WORKERS", 0)) or None)
+training_pool = TrainingPool(training_plan)
+logger.info(f"Training plan: {training_plan}")
+
+# --- admission control for the CPU-heavy prediction path ---
+PREDICT_WORKERS = training_plan["jobs"]
+PREDICT_QUEUE = int(os.environ.get("PREDICT_QUEUE", 4))            # callers allowed to wait
+PREDICT_MAX_WAIT = float(os.environ.get("PREDICT_MAX_WAIT", 60))   # seconds in queue before 503
+USER_RATE = float(os.environ.get("PREDICT_USER_RATE", 1 / 30))     # predictions per second per user
+USER_BURST = int(os.environ.get("PREDICT_USER_BURST", 3))
+admission = AdmissionController(PREDICT_WORKERS, PREDICT_QUEUE, PREDICT_MAX_WAIT)
+rate_limiter = RateLimiter(USER_RATE, USER_BURST)
+
+# --- latency budget per forecast (request "budget_s" overrides, clamped to the max) ---
+PREDICT_BUDGET = float(os.environ.get("PREDICT_BUDGET", 60))
+PREDICT_MAX_BUDGET = float(os.environ.get("PREDICT_MAX_BUDGET", 180))
+PREDICT_RESERVE = 5.0   # seconds kept back for the 30-step forecast
+MAX_EPOCHS = 20
+
+# recent forecasts are served without training (and without queueing)
+PREDICTION_TTL = 900
+prediction_cache = {}
+prediction_cache_lock = threading.Lock()
+
+# submit-and-poll prediction jobs (kept in memory, dropped JOB_TTL seconds after finishing)
+JOB_TTL = 600
+job_executor = ThreadPoolExecutor(max_workers=PREDICT_WORKERS + PREDICT_QUEUE)
+jobs = {}
+jobs_lock = threading.Lock()
+
 # ---------- helpers ----------
 def load_users():
     with open(USERS_FILE, "r") as fp:
@@ -59,12 +110,26 @@ def load_history():
 
 def save_history(history):
     with open(HISTORY_FILE, "w") as fp:
-        json.dump(history, fp, indent=2)
+        json.dump(history, fp, separators=(",", ":"))
+
+def respond(body, status):
+    """
+    Encode a prediction/history body in the format picked from the Accept
+    header (row JSON, columnar JSON or msgpack) and compress large ones.
+    """
+    mimetype = request.accept_mimetypes.best_match(offered_types(), default=JSON)
+    data, content_type = encode(body, mimetype)
+    data, content_encoding = compress(data, request.headers.get("Accept-Encoding", ""))
+    resp = Response(data, status=status, content_type=content_type)
+    if content_encoding:
+        resp.headers["Content-Encoding"] = content_encoding
+    resp.headers["Vary"] = "Accept, Accept-Encoding"
+    return resp
 
 # ---------- routes ----------
 @app.get("/ping")
 def ping():
-    return jsonify({"status": "ok"}), 200
+    return jsonify({"status": "ok", "admission": admission.stats()}), 200
 
 @app.post("/register")
 def register():
@@ -104,67 +169,113 @@ def login():
         logger.exception("Error in /login")
         return jsonify({"error": "server_error", "detail": str(e)}), 500
 
-@app.post("/predict")
-def predict():
+# ---------- prediction ----------
+def update_prices(ticker):
     """
-    Request JSON: { "ticker": "AAPL", "username": "optional_user" }
-    Response JSON: { "ticker": "...", "predictions": [{date, price}, ...] }
+    Download only the days from the ticker's last stored close on (3y the
+    first time), at most once per PRICE_REFRESH seconds per ticker and process.
+    Concurrent requests for the same ticker share one download; the check
+    time is only recorded once a download has been stored, so a failed one is
+    retried by the next request.
     """
+    with price_checked_lock:
+        if time.time() - price_checked.get(ticker, 0) < PRICE_REFRESH and ticker in price_store:
+            return
+        flight = price_inflight.get(ticker)
+        leader = flight is None
+        if leader:
+            flight = price_inflight[ticker] = threading.Event()
+    if not leader:
+        # another request is downloading this ticker; use what it stored
+        flight.wait()
+        return
+
     try:
-        payload = request.get_json(force=True)
-        ticker = str(payload.get("ticker", "")).upper().strip()
-        username = payload.get("username")
+        last = price_store.last_date(ticker) if ticker in price_store else None
+        if last is None:
+            df = yf.download(ticker, period="3y", interval="1d", progress=False)
+        else:
+            # from the last stored day on, so a close stored mid-session gets corrected
+            df = yf.download(ticker, start=last.strftime("%Y-%m-%d"), interval="1d", progress=False)
+
+        if df is not None and not df.empty and "Close" in df.columns:
+            price_store.upsert(ticker, df)
+            with price_checked_lock:
+                price_checked[ticker] = time.time()
+    finally:
+        with price_checked_lock:
+            price_inflight.pop(ticker, None)
+        flight.set()
+
+def training_time_left(budget_s, started):
+    """
+    Seconds left for training once the forecast reserve is kept back.
+    Raises Rejected (503) when queueing and downloading already used the budget.
+    """
+    left = budget_s - (time.monotonic() - started) - PREDICT_RESERVE
+    if left < 1.0:
+        raise Rejected("budget_exhausted", 503, admission.stats()["avg_service_s"])
+    return left
 
-        if not ticker:
-            return jsonify({"error": "ticker_required"}), 400
+def run_prediction(ticker, username=None, report=None, budget_s=None, arrived=None):
+    """
+    Downloads, trains and forecasts one ticker.
+    report: optional callable(stage, progress) used by background jobs
+    budget_s: seconds the whole request may take (PREDICT_BUDGET by default)
+    arrived: time.monotonic() when the request came in, so time spent
+             queueing for a slot counts against the budget
+    Returns: (body dict, http status); raises Rejected when the budget is spent
+    """
+    report = report or (lambda stage, progress: None)
+    budget_s = budget_s or PREDICT_BUDGET
+    started = arrived or time.monotonic()
 
-        # fetch data (3y gives enough history)
-        try:
-            df = yf.download(ticker, period="3y", interval="1d", progress=False)
-        except Exception as e:
-            logger.exception("yfinance failed")
-            return jsonify({"error": "yfinance_failed", "detail": str(e)}), 500
-
-        if df is None or df.empty or "Close" not in df.columns:
-            return jsonify({"error": "no_data_for_ticker"}), 400
-
-        df_close = df[["Close"]].dropna()
-        if df_close.empty or len(df_close) < 80:
-            return jsonify({"error": "not_enough_data"}), 400
-
-        # prepare last_60 and scaler
-        last_60, scaler = prepare_new_data(df_close)
-
-        # Build quick model (same architecture as training)
-        model = Sequential()
-        model.add(LSTM(50, return_sequences=True, input_shape=(60, 1)))
-        model.add(LSTM(50))
-        model.add(Dense(1))
-        model.compile(loss="mse", optimizer="adam")
-
-        # create dataset from full series and train briefly
-        scaled_all = scaler.transform(df_close.values.astype(float))
-        X_all = []
-        y_all = []
-        for i in range(60, len(scaled_all)):
-            X_all.append(scaled_all[i-60:i, 0])
-            y_all.append(scaled_all[i, 0])
-        X_all = np.array(X_all).reshape(-1, 60, 1)
-        y_all = np.array(y_all)
-
-        # quick train (2 epochs)
-        model.fit(X_all, y_all, epochs=2, batch_size=32, verbose=0)
-
-        # predict next 30
-        preds = predict_next_30(model, last_60, scaler)  # numpy array (30,)
-
-        # build dates - use last valid index from df_close
-        last_date = df_close.index[-1]
-        dates = [(last_date + pd.Timedelta(days=i+1)).strftime("%Y-%m-%d") for i in range(30)]
-        preds_list = [{"date": d, "price": float(round(float(p), 4))} for d, p in zip(dates, preds.tolist())]
-
-        # save user history if username provided
-        if username:
+    # the first request starts the training workers
+    training_pool.start()
+    training_time_left(budget_s, started)
+
+    # bring the stored history up to date (3y gives enough history)
+    report("downloading", 0.05)
+    try:
+        update_prices(ticker)
+    except Exception as e:
+        logger.exception("yfinance failed")
+        return {"error": "yfinance_failed", "detail": str(e)}, 500
+
+    if ticker not in price_store:
+        return {"error": "no_data_for_ticker"}, 400
+
+    start = pd.Timestamp.today().normalize() - pd.DateOffset(years=3)
+    df_close = price_store.frame(ticker, fields=["Close"], start=start).dropna()
+    if df_close.empty or len(df_close) < 80:
+        return {"error": "not_enough_data"}, 400
+
+    # train until the loss plateaus or the latency budget is spent, leaving
+    # time for the 30-step forecast; runs in a worker pinned to its own cores
+    report("training", 0.15)
+    train_budget = training_time_left(budget_s, started)
+    preds, training = training_pool.forecast(
+        df_close, train_budget, max_epochs=MAX_EPOCHS,
+        on_epoch=lambda epoch, used: report("training", 0.15 + 0.7 * used),
+    )
+    logger.info(f"Trained {ticker}: {training}")
+
+    # build dates - use last valid index from df_close
+    last_date = df_close.index[-1]
+    dates = [(last_date + pd.Timedelta(days=i+1)).strftime("%Y-%m-%d") for i in range(30)]
+    preds_list = [{"date": d, "price": float(round(float(p), 4))} for d, p in zip(dates, preds.tolist())]
+
+    with prediction_cache_lock:
+        prediction_cache[ticker] = (time.time(), preds_list)
+    record_history(username, ticker, preds_list)
+
+    report("done", 1.0)
+    return {"ticker": ticker, "predictions": preds_list, "training": training}, 200
+
+def record_history(username, ticker, preds_list):
+    # save user history if username provided
+    if username:
+        with history_lock:
             history = load_history()
             user_hist = history.get(username, [])
             user_hist.append({
@@ -175,17 +286,201 @@ def predict():
             history[username] = user_hist
             save_history(history)
 
-        return jsonify({"ticker": ticker, "predictions": preds_list}), 200
+def cached_prediction(ticker, username=None):
+    """Returns: response body for a forecast made in the last PREDICTION_TTL seconds, or None"""
+    with prediction_cache_lock:
+        hit = prediction_cache.get(ticker)
+    if not hit or time.time() - hit[0] > PREDICTION_TTL:
+        return None
+    record_history(username, ticker, hit[1])
+    return {"ticker": ticker, "predictions": hit[1], "cached": True}
+
+def rejected_response(e):
+    resp = jsonify({"error": e.error, "retry_after": e.retry_after})
+    resp.headers["Retry-After"] = str(e.retry_after)
+    return resp, e.status
+
+def _parse_predict_payload():
+    payload = request.get_json(force=True)
+    ticker = str(payload.get("ticker", "")).upper().strip()
+    username = payload.get("username")
+    try:
+        budget_s = float(payload.get("budget_s") or PREDICT_BUDGET)
+    except (TypeError, ValueError):
+        budget_s = PREDICT_BUDGET
+    # at least a few seconds of training on top of the forecast reserve
+    return ticker, username, min(max(budget_s, PREDICT_RESERVE + 5.0), PREDICT_MAX_BUDGET)
+
+def _rate_key(username):
+    return f"user:{username}" if username else f"addr:{request.remote_addr}"
+
+# ---------- background jobs ----------
+def _set_job(job_id, **fields):
+    with jobs_lock:
+        if job_id in jobs:
+            jobs[job_id].update(fields)
+
+def _run_job(job_id, ticker, username, budget_s, ticket, arrived):
+    # the place in line was reserved at submit time, so this only waits for a slot
+    admission.wait(ticket, timeout=None)
+    _set_job(job_id, status="running")
+    try:
+        body, status = run_prediction(
+            ticker, username,
+            report=lambda stage, progress: _set_job(job_id, stage=stage, progress=round(progress, 3)),
+            budget_s=budget_s, arrived=arrived,
+        )
+    except Rejected as e:
+        body, status = {"error": e.error, "retry_after": e.retry_after}, e.status
+    except Exception as e:
+        logger.exception("ERROR IN prediction job")
+        body, status = {"error": "server_error", "detail": str(e)}, 500
+    finally:
+        admission.release(ticket)
+    if status == 200:
+        _set_job(job_id, status="done", result=body, finished=time.time())
+    else:
+        _set_job(job_id, status="error", error=body, http_status=status, finished=time.time())
+
+def _prune_jobs():
+    cutoff = time.time() - JOB_TTL
+    with jobs_lock:
+        for job_id in [k for k, v in jobs.items() if v.get("finished") and v["finished"] < cutoff]:
+            del jobs[job_id]
 
+@app.post("/predict")
+def predict():
+    """
+    Request JSON: { "ticker": "AAPL", "username": "optional_user", "budget_s": optional seconds }
+    Response JSON: { "ticker": "...", "predictions": [{date, price}, ...],
+                     "training": {epochs, best_epoch, seconds, loss, val_loss, batch_size, stopped} }
+    budget_s covers the whole request, time waiting for a slot included; when
+    that leaves no time to train the answer is 503 with Retry-After.
+    """
+    arrived = time.monotonic()
+    try:
+        ticker, username, budget_s = _parse_predict_payload()
+        if not ticker:
+            return jsonify({"error": "ticker_required"}), 400
+
+        rate_limiter.check(_rate_key(username))
+        cached = cached_prediction(ticker, username)
+        if cached:
+            return respond(cached, 200)
+
+        # no point queueing longer than the budget leaves time to train
+        with admission.slot(timeout=min(PREDICT_MAX_WAIT, budget_s - PREDICT_RESERVE - 1.0)):
+            body, status = run_prediction(ticker, username, budget_s=budget_s, arrived=arrived)
+        return respond(body, status)
+
+    except Rejected as e:
+        return rejected_response(e)
     except Exception as e:
         logger.exception("ERROR IN /predict")
         return jsonify({"error": "server_error", "detail": str(e)}), 500
 
+@app.post("/predict/jobs")
+def submit_predict_job():
+    """
+    Same request as /predict but returns immediately.
+    Response JSON (202): { "job_id": "...", "status": "queued" }
+    """
+    arrived = time.monotonic()
+    try:
+        ticker, username, budget_s = _parse_predict_payload()
+        if not ticker:
+            return jsonify({"error": "ticker_required"}), 400
+
+        rate_limiter.check(_rate_key(username))
+        _prune_jobs()
+        job_id = uuid.uuid4().hex
+
+        cached = cached_prediction(ticker, username)
+        if cached:
+            with jobs_lock:
+                jobs[job_id] = {"ticker": ticker, "status": "done", "stage": "done", "progress": 1.0,
+                                "result": cached, "finished": time.time()}
+            return jsonify({"job_id": job_id, "status": "done"}), 202
+
+        ticket = admission.reserve()
+        with jobs_lock:
+            jobs[job_id] = {"ticker": ticker, "status": "queued", "stage": "queued", "progress": 0.0}
+        job_executor.submit(_run_job, job_id, ticker, username, budget_s, ticket, arrived)
+        return jsonify({"job_id": job_id, "status": "queued"}), 202
+    except Rejected as e:
+        return rejected_response(e)
+    except Exception as e:
+        logger.exception("Error in /predict/jobs")
+        return jsonify({"error": "server_error", "detail": str(e)}), 500
+
+@app.get("/predict/jobs/<job_id>")
+def get_predict_job(job_id):
+    """
+    Response JSON: { "job_id", "ticker", "status": queued|running|done|error,
+                     "stage", "progress" (0..1), "result" | "error" }
+    """
+    with jobs_lock:
+        job = dict(jobs.get(job_id) or {})
+    if not job:
+        return jsonify({"error": "job_not_found"}), 404
+    job.pop("finished", None)
+    job["job_id"] = job_id
+    return respond(job, 200)
+
+def summarize_entry(entry_id, entry):
+    """History entry without the 30-point prediction array."""
+    preds = entry.get("predictions", [])
+    return {
+        "id": entry_id,
+        "timestamp": entry.get("timestamp"),
+        "ticker": entry.get("ticker"),
+        "points": len(preds),
+        "start_date": preds[0]["date"] if preds else None,
+        "end_date": preds[-1]["date"] if preds else None,
+        "start_price": preds[0]["price"] if preds else None,
+        "end_price": preds[-1]["price"] if preds else None,
+    }
+
 @app.get("/history/<username>")
 def get_history(username):
+    """
+    Without query args: { "history": [full entries, oldest first] }
+
+    Paginated (newest first): ?limit=20&cursor=<next_cursor>&summary=1&ticker=AAPL
+    Response JSON: { "history": [...], "next_cursor": int | null, "total": int }
+    Entries carry an "id" (position in the append-only history, also the
+    cursor just past them); summary=1 drops the prediction arrays. limit is
+    capped at 200. total counts the entries matching `ticker` when given.
+    """
     try:
         history = load_history()
-        return jsonify({"history": history.get(username, [])}), 200
+        user_hist = history.get(username, [])
+
+        limit = request.args.get("limit", type=int)
+        summary = request.args.get("summary", "0").lower() in ("1", "true", "yes")
+        ticker = request.args.get("ticker", "").upper().strip()
+        if limit is None and not summary and not ticker:
+            return respond({"history": user_hist}, 200)
+
+        limit = max(1, min(limit or 50, 200))
+        cursor = request.args.get("cursor", type=int)
+        if cursor is None or cursor > len(user_hist):
+            cursor = len(user_hist)
+
+        page = []
+        i = cursor - 1
+        while i >= 0 and len(page) < limit:
+            entry = user_hist[i]
+            if not ticker or entry.get("ticker") == ticker:
+                page.append(summarize_entry(i, entry) if summary else dict(entry, id=i))
+            i -= 1
+
+        next_cursor = i + 1 if i >= 0 else None
+        if ticker:
+            total = sum(1 for entry in user_hist if entry.get("ticker") == ticker)
+        else:
+            total = len(user_hist)
+        return respond({"history": page, "next_cursor": next_cursor, "total": total}, 200)
     except Exception as e:
         logger.exception("Error in /history")
         return jsonify({"error": "server_error", "detail": str(e)}), 500
@@ -0,0 +1,100 @@
+# backend/benchmark_payload.py
+"""
+Payload size and client parse time: row JSON vs columnar formats.
+
+  python benchmark_payload.py                  # uses data/history.json
+  python benchmark_payload.py --entries 2000   # synthetic history of that size
+
+Parse time covers decoding plus building the per-entry DataFrames the
+frontend draws (plain dicts of lists when pandas is not installed).
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import time
+
+from utils.encoding import JSON, COLUMNAR_JSON, MSGPACK, encode, msgpack, brotli
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "history.json")
+
+
+def synthetic_history(n):
+    entries = []
+    for i in range(n):
+        price = random.uniform(50, 3000)
+        entries.append({
+            "timestamp": f"2025-11-{1 + i % 28:02d}T10:00:00.000000",
+            "ticker": random.choice(["AAPL", "TSLA", "INFY.NS", "TCS.NS"]),
+            "predictions": [{"date": f"2025-12-{d + 1:02d}", "price": round(price * (1 + d / 1000), 4)}
+                            for d in range(30)],
+        })
+    return {"history": entries}
+
+
+def build_frames(body):
+    frames = []
+    for item in body["history"]:
+        if "dates" in item:
+            cols = {"date": item["dates"], "price": item["prices"]}
+            frames.append(pd.DataFrame(cols) if pd else cols)
+        else:
+            rows = item["predictions"]
+            frames.append(pd.DataFrame(rows) if pd else
+                          {"date": [r["date"] for r in rows], "price": [r["price"] for r in rows]})
+    return frames
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--entries", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    if args.entries:
+        body = synthetic_history(args.entries)
+    else:
+        with open(HISTORY_FILE) as fp:
+            body = {"history": [e for entries in json.load(fp).values() for e in entries]}
+    print(f"{len(body['history'])} history entries, frames built with {'pandas' if pd else 'dicts'}\n")
+
+    legacy_file = json.dumps(body["history"], indent=2).encode()
+    rows, _ = encode(body, JSON)
+    cols, _ = encode(body, COLUMNAR_JSON)
+    variants = [
+        ("indent=2 history file", legacy_file, json.loads),
+        ("row JSON (before)", rows, json.loads),
+        ("row JSON + gzip", gzip.compress(rows, 6), lambda d: json.loads(gzip.decompress(d))),
+        ("columnar JSON", cols, json.loads),
+        ("columnar JSON + gzip", gzip.compress(cols, 6), lambda d: json.loads(gzip.decompress(d))),
+    ]
+    if brotli:
+        variants.append(("columnar JSON + br", brotli.compress(cols, quality=5),
+                         lambda d: json.loads(brotli.decompress(d))))
+    if msgpack:
+        packed, _ = encode(body, MSGPACK)
+        variants.append(("columnar msgpack", packed, lambda d: msgpack.unpackb(d, raw=False)))
+
+    print(f"{'format':<24}{'bytes':>10}{'vs before':>11}{'decode ms':>11}{'decode+frames ms':>18}")
+    for name, data, decode in variants:
+        decode_ms = timed(lambda: decode(data), args.repeat)
+        if name == "indent=2 history file":
+            frames_ms = timed(lambda: build_frames({"history": decode(data)}), args.repeat)
+        else:
+            frames_ms = timed(lambda: build_frames(decode(data)), args.repeat)
+        print(f"{name:<24}{len(data):>10}{len(data) / len(rows):>10.0%}{decode_ms:>11.2f}{frames_ms:>18.2f}")
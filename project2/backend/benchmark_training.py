@@ -0,0 +1,81 @@
+# backend/benchmark_training.py
+"""
+Aggregate forecasts per minute at 1, 4 and 16 concurrent requests.
+
+  python benchmark_training.py                       # both policies, 1/4/16
+  python benchmark_training.py --policy throughput --concurrency 4
+  python benchmark_training.py --cores 8             # plan for 8 of the cores
+
+Runs the same TrainingPool the backend uses: one worker process per job of
+the plan, each pinned to its own cores. A "forecast" is the same work as
+/predict minus the download: build, train_within_budget() on ~3 years of
+synthetic closes with --budget seconds (batch size picked the same way), then
+roll 30 steps forward. Requests beyond the plan's job count wait for a free
+worker, like the admission controller makes them.
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.scheduler import plan_training
+from utils.training_pool import TrainingPool
+
+
+def synthetic_closes(rows):
+    rng = np.random.default_rng(0)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    return pd.DataFrame({"Close": closes}, index=pd.bdate_range("2022-01-03", periods=rows))
+
+
+def run_batch(pool, df_close, concurrency, budget_s, max_epochs):
+    latencies, epochs = [], []
+
+    def request():
+        start = time.monotonic()
+        _, training = pool.forecast(df_close, budget_s, max_epochs)
+        latencies.append(time.monotonic() - start)
+        epochs.append(training["epochs"])
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=request) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - start
+
+    latencies.sort()
+    return {
+        "mean_epochs": round(sum(epochs) / len(epochs), 1),
+        "forecasts_per_min": round(concurrency * 60 / elapsed, 2),
+        "p50_s": round(latencies[len(latencies) // 2], 2),
+        "max_s": round(latencies[-1], 2),
+    }
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--policy", choices=["throughput", "latency"], action="append")
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    ap.add_argument("--cores", type=int, default=None, help="cores to plan for (default: all allowed)")
+    ap.add_argument("--rows", type=int, default=750, help="trading days per series (~3y)")
+    ap.add_argument("--budget", type=float, default=60, help="training seconds per forecast")
+    ap.add_argument("--max-epochs", type=int, default=20)
+    args = ap.parse_args()
+
+    df_close = synthetic_closes(args.rows)
+    print(f"{'policy':<11}{'conc':>5}{'jobs':>5}{'thr/job':>8}{'batch':>6}{'epochs':>7}{'fcst/min':>10}{'p50 s':>8}{'max s':>8}")
+    for policy in args.policy or ["latency", "throughput"]:
+        plan = plan_training(policy, cores=args.cores)
+        pool = TrainingPool(plan)
+        pool.start()
+        # warm-up (graph tracing, thread pool start) in every worker
+        run_batch(pool, df_close, plan["jobs"], args.budget, args.max_epochs)
+        for c in args.concurrency:
+            r = run_batch(pool, df_close, c, args.budget, args.max_epochs)
+            print(f"{policy:<11}{c:>5}{plan['jobs']:>5}{plan['threads_per_job']:>8}{plan['batch_size']:>6}"
+                  f"{r['mean_epochs']:>7}{r['forecasts_per_min']:>10}{r['p50_s']:>8}{r['max_s']:>8}")
+        pool.close()
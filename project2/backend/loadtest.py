@@ -0,0 +1,151 @@
+# backend/loadtest.py
+"""
+Overload test for the /predict admission control.
+
+  python loadtest.py --simulate                 # no server or TensorFlow needed
+  python loadtest.py --url http://127.0.0.1:5000 --rate 1 --requests 64
+
+Requests arrive open-loop at --rate per second, above what the slots can
+serve. Rejected requests wait for Retry-After and retry (--retries). --simulate
+drives utils.admission with a sleep() standing in for training and compares
+it against an unbounded queue (the old behaviour); --url fires real POST
+/predict calls at a running backend. Both report goodput and end-to-end
+latency (including retries) of served requests, plus the requests that gave up.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+from utils.admission import AdmissionController, RateLimiter, Rejected
+
+
+def percentiles(values):
+    if not values:
+        return "-"
+    v = sorted(values)
+    pick = lambda q: v[min(len(v) - 1, int(q * len(v)))]
+    return f"n={len(v):4d}  p50={pick(0.50):7.2f}s  p95={pick(0.95):7.2f}s  p99={pick(0.99):7.2f}s  max={v[-1]:7.2f}s"
+
+
+def run_open_loop(rate, n_requests, call, max_retries):
+    """
+    Open-loop arrivals: request i starts at i / rate whether or not earlier
+    ones finished. A rejected request sleeps for its Retry-After and tries
+    again, up to max_retries times, like a well-behaved client.
+    Returns: list of (outcome, end-to-end seconds, attempts), elapsed seconds
+    """
+    results = []
+    lock = threading.Lock()
+
+    def user_request(i):
+        start = time.monotonic()
+        for attempt in range(1, max_retries + 2):
+            status, retry_after = call(i)
+            if status == 200 or attempt > max_retries or retry_after is None:
+                break
+            time.sleep(retry_after)
+        with lock:
+            results.append((status, time.monotonic() - start, attempt))
+
+    threads = []
+    t0 = time.monotonic()
+    for i in range(n_requests):
+        time.sleep(max(0.0, t0 + i / rate - time.monotonic()))
+        t = threading.Thread(target=user_request, args=(i,))
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+    return results, time.monotonic() - t0
+
+
+def report(title, results, elapsed):
+    served = [lat for status, lat, _ in results if status == 200]
+    attempts = sum(a for _, _, a in results)
+    print(f"\n{title}")
+    print(f"  served {len(served)}/{len(results)}, goodput {len(served) / elapsed:.2f} req/s "
+          f"over {elapsed:.1f}s, {attempts} attempts")
+    print(f"  served latency (incl. retries): {percentiles(served)}")
+    by_status = defaultdict(list)
+    for status, lat, _ in results:
+        if status != 200:
+            by_status[status].append(lat)
+    for status in sorted(by_status, key=str):
+        print(f"  gave up with {status}: {percentiles(by_status[status])}")
+
+
+def simulate(args):
+    def work():
+        time.sleep(random.uniform(0.5, 1.5) * args.service_time)
+
+    # old behaviour: every request eventually trains, up to `workers` at a time
+    unbounded = threading.Semaphore(args.workers)
+
+    def call_unbounded(i):
+        with unbounded:
+            work()
+        return 200, None
+
+    controller = AdmissionController(args.workers, args.queue, args.max_wait,
+                                     service_estimate=args.service_time)
+    limiter = RateLimiter(args.user_rate, args.user_burst)
+
+    def call_admitted(i):
+        try:
+            limiter.check(f"user:{i % args.users}")
+            with controller.slot():
+                work()
+            return 200, None
+        except Rejected as e:
+            return e.status, e.retry_after
+
+    capacity = args.workers / args.service_time
+    print(f"{args.requests} requests arriving at {args.rate}/s (capacity ~{capacity:.1f}/s), "
+          f"{args.workers} slots, ~{args.service_time}s per training, up to {args.retries} retries")
+    report("unbounded queue (before)", *run_open_loop(args.rate, args.requests, call_unbounded, 0))
+    report("admission control (after)",
+           *run_open_loop(args.rate, args.requests, call_admitted, args.retries))
+
+
+def live(args):
+    tickers = args.tickers.split(",")
+
+    def call(i):
+        body = json.dumps({"ticker": tickers[i % len(tickers)], "username": f"loadtest{i % args.users}"})
+        req = urllib.request.Request(f"{args.url}/predict", data=body.encode(),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            with urllib.request.urlopen(req, timeout=args.timeout) as r:
+                return r.status, None
+        except urllib.error.HTTPError as e:
+            retry_after = e.headers.get("Retry-After")
+            return e.code, float(retry_after) if retry_after else None
+        except Exception:
+            return "timeout/error", None
+
+    report(f"{args.url}/predict", *run_open_loop(args.rate, args.requests, call, args.retries))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--simulate", action="store_true")
+    ap.add_argument("--url", default="http://127.0.0.1:5000")
+    ap.add_argument("--tickers", default="AAPL,MSFT,TSLA,INFY.NS")
+    ap.add_argument("--timeout", type=float, default=210)
+    ap.add_argument("--rate", type=float, default=4.0, help="request arrivals per second")
+    ap.add_argument("--requests", type=int, default=64)
+    ap.add_argument("--retries", type=int, default=3, help="retries after Retry-After per request")
+    ap.add_argument("--users", type=int, default=8)
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--queue", type=int, default=4)
+    ap.add_argument("--max-wait", type=float, default=3.0)
+    ap.add_argument("--service-time", type=float, default=1.0)
+    ap.add_argument("--user-rate", type=float, default=0.5)
+    ap.add_argument("--user-burst", type=int, default=3)
+    args = ap.parse_args()
+    simulate(args) if args.simulate else live(args)
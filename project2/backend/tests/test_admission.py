@@ -0,0 +1,122 @@
+# backend/tests/test_admission.py
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import admission
+from utils.admission import AdmissionController, RateLimiter, Rejected, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = FakeClock()
+    monkeypatch.setattr(admission.time, "monotonic", c)
+    return c
+
+
+def test_full_queue_is_rejected_with_503(clock):
+    ctl = AdmissionController(max_concurrent=1, max_queue=2, max_wait=10, service_estimate=30)
+    assert ctl.reserve()["admitted"]
+    ctl.reserve()
+    ctl.reserve()
+    with pytest.raises(Rejected) as e:
+        ctl.reserve()
+    assert e.value.status == 503
+    assert e.value.error == "server_busy"
+    # two waiting ahead of one slot: about three service times
+    assert e.value.retry_after == 90
+    assert ctl.stats() == {"running": 1, "waiting": 2, "avg_service_s": 30}
+
+
+def test_wait_timeout_removes_ticket():
+    ctl = AdmissionController(max_concurrent=1, max_queue=2, max_wait=0.05)
+    ctl.reserve()
+    ticket = ctl.reserve()
+    with pytest.raises(Rejected) as e:
+        ctl.wait(ticket)
+    assert e.value.error == "queue_timeout"
+    assert e.value.status == 503
+    assert ctl.stats()["waiting"] == 0
+    # the freed place in line can be taken again
+    ctl.reserve()
+    assert ctl.stats()["waiting"] == 1
+
+
+def test_release_hands_slot_to_oldest_waiter(clock):
+    ctl = AdmissionController(max_concurrent=1, max_queue=3, max_wait=10, service_estimate=10)
+    running = ctl.reserve()
+    first, second = ctl.reserve(), ctl.reserve()
+
+    clock.now += 20
+    ctl.release(running)
+    assert first["admitted"] and not second["admitted"]
+    assert ctl.stats() == {"running": 1, "waiting": 1, "avg_service_s": 12.0}
+    # a newcomer queues behind the waiter instead of jumping the line
+    late = ctl.reserve()
+    assert not late["admitted"]
+
+    ctl.release(ctl.wait(first))
+    assert second["admitted"] and not late["admitted"]
+
+
+def test_wait_returns_once_released():
+    ctl = AdmissionController(max_concurrent=1, max_queue=1, max_wait=5)
+    running = ctl.reserve()
+    ticket = ctl.reserve()
+    waiter = threading.Thread(target=ctl.wait, args=(ticket,))
+    waiter.start()
+    ctl.release(running)
+    waiter.join(5)
+    assert not waiter.is_alive()
+    assert ticket["admitted"]
+
+
+def test_slot_releases_on_error(clock):
+    ctl = AdmissionController(max_concurrent=1, max_queue=0)
+    with pytest.raises(ValueError):
+        with ctl.slot():
+            raise ValueError("training failed")
+    assert ctl.stats()["running"] == 0
+
+
+def test_token_bucket_refills(clock):
+    bucket = TokenBucket(rate=0.5, burst=2)
+    assert bucket.take() == (True, 0.0)
+    assert bucket.take() == (True, 0.0)
+    allowed, wait = bucket.take()
+    assert not allowed and wait == pytest.approx(2.0)
+
+    clock.now += 1.0
+    allowed, wait = bucket.take()
+    assert not allowed and wait == pytest.approx(1.0)
+    clock.now += 1.0
+    assert bucket.take()[0]
+    # refill never goes past the burst size
+    clock.now += 100
+    assert [bucket.take()[0] for _ in range(3)] == [True, True, False]
+
+
+def test_rate_limiter_429_per_key(clock):
+    limiter = RateLimiter(rate=1 / 30, burst=1)
+    limiter.check("user:a")
+    with pytest.raises(Rejected) as e:
+        limiter.check("user:a")
+    assert e.value.status == 429
+    assert e.value.error == "rate_limited"
+    assert e.value.retry_after == 30
+    limiter.check("user:b")  # other users have their own bucket
+
+    clock.now += 30
+    limiter.check("user:a")
@@ -0,0 +1,80 @@
+# backend/tests/test_price_store.py
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.price_store import PriceStore
+
+
+def closes(start, days, base=100.0):
+    idx = pd.bdate_range(start, periods=days)
+    return pd.DataFrame({"Close": base + np.arange(days, dtype=float)}, index=idx)
+
+
+def test_upsert_and_read_back(tmp_path):
+    store = PriceStore(str(tmp_path), origin="2020-01-01", date_capacity=400)
+    df = closes("2020-01-06", 20)
+    store.upsert("AAPL", df)
+
+    out = store.frame("AAPL")
+    assert list(out.index) == list(df.index)
+    np.testing.assert_allclose(out["Close"].values, df["Close"].values)
+    assert store.last_date("AAPL") == df.index[-1]
+    # weekends stay NaN on the calendar-day axis
+    assert np.isnan(store.get("AAPL", start="2020-01-11", end="2020-01-12")).all()
+
+
+def test_append_keeps_files_in_place(tmp_path):
+    store = PriceStore(str(tmp_path), origin="2020-01-01", date_capacity=400)
+    store.upsert("AAPL", closes("2020-01-06", 10))
+    inode = os.stat(tmp_path / "close.f32").st_ino
+
+    store.upsert("AAPL", closes("2020-01-20", 5, base=200.0))
+    assert os.stat(tmp_path / "close.f32").st_ino == inode
+    assert len(store.frame("AAPL")) == 15
+
+
+def test_ticker_growth(tmp_path):
+    store = PriceStore(str(tmp_path), origin="2020-01-01", ticker_capacity=2, date_capacity=100)
+    for i, t in enumerate(["A", "B", "C", "D", "E"]):
+        store.upsert(t, closes("2020-01-06", 5, base=10.0 * i))
+    assert store.ticker_capacity >= 5
+    for i, t in enumerate(["A", "B", "C", "D", "E"]):
+        assert store.frame(t)["Close"].iloc[0] == 10.0 * i
+    assert store.matrix().shape == (5, 100)
+
+
+def test_date_growth(tmp_path):
+    store = PriceStore(str(tmp_path), origin="2020-01-01", date_capacity=30)
+    store.upsert("AAPL", closes("2020-01-06", 5))
+    store.upsert("AAPL", closes("2020-03-02", 5, base=300.0))
+    assert store.date_capacity >= store.column("2020-03-06") + 1
+    out = store.frame("AAPL")
+    assert len(out) == 10
+    assert out["Close"].iloc[0] == 100.0 and out["Close"].iloc[-1] == 304.0
+
+
+def test_two_writers_share_one_index(tmp_path):
+    # two handles on the same directory stand in for two worker processes
+    a = PriceStore(str(tmp_path), origin="2020-01-01", ticker_capacity=2, date_capacity=30)
+    b = PriceStore(str(tmp_path))
+    a.upsert("AAPL", closes("2020-01-06", 5, base=1.0))
+    b.upsert("MSFT", closes("2020-01-06", 5, base=2.0))
+    a.upsert("TSLA", closes("2020-01-06", 5, base=3.0))   # grows rows
+    b.upsert("MSFT", closes("2020-03-02", 5, base=4.0))   # grows dates
+
+    assert a.row("AAPL") != b.row("MSFT") != a.row("TSLA")
+    for store in (a, b):
+        assert store.frame("AAPL")["Close"].iloc[0] == 1.0
+        assert store.frame("MSFT")["Close"].iloc[-1] == 8.0
+        assert store.frame("TSLA")["Close"].iloc[0] == 3.0
+
+    reader = PriceStore(str(tmp_path), mode="r")
+    assert "TSLA" in reader
+    with pytest.raises(PermissionError):
+        reader.upsert("NVDA", closes("2020-01-06", 5))
@@ -0,0 +1,47 @@
+# backend/tests/test_scheduler.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import scheduler
+from utils.scheduler import plan_training, pin_worker
+
+
+@pytest.mark.parametrize("policy,cores,jobs,threads", [
+    ("throughput", 16, 8, 2),
+    ("throughput", 1, 1, 1),
+    ("latency", 16, 2, 8),
+    ("latency", 4, 1, 4),
+])
+def test_plan_never_oversubscribes(policy, cores, jobs, threads):
+    plan = plan_training(policy, cores=cores)
+    assert (plan["jobs"], plan["threads_per_job"]) == (jobs, threads)
+    assert plan["jobs"] * plan["threads_per_job"] <= cores
+
+
+def test_max_jobs_gives_remaining_cores_to_each_job():
+    plan = plan_training("throughput", cores=16, max_jobs=2)
+    assert (plan["jobs"], plan["threads_per_job"]) == (2, 8)
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        plan_training("fastest")
+
+
+def test_workers_pinned_to_disjoint_cores(monkeypatch):
+    if not hasattr(os, "sched_setaffinity"):
+        pytest.skip("no CPU affinity on this platform")
+    pinned = {}
+    monkeypatch.setattr(scheduler.os, "sched_getaffinity", lambda pid: set(range(8, 16)))
+    plan = plan_training("throughput", cores=8)
+    for i in range(plan["jobs"]):
+        monkeypatch.setattr(scheduler.os, "sched_setaffinity", lambda pid, cpus, i=i: pinned.update({i: set(cpus)}))
+        pin_worker(i, plan)
+
+    assert sorted(pinned) == list(range(plan["jobs"]))
+    assert all(len(cpus) == plan["threads_per_job"] for cpus in pinned.values())
+    assert set().union(*pinned.values()) == set(range(8, 16))
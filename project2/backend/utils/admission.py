@@ -0,0 +1,136 @@
+# backend/utils/admission.py
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class Rejected(Exception):
+    """Raised when a request is refused; carries the HTTP status and a Retry-After hint."""
+
+    def __init__(self, error, status, retry_after):
+        super().__init__(error)
+        self.error = error
+        self.status = status
+        self.retry_after = max(1, int(round(retry_after)))
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = float(rate)      # tokens added per second
+        self.burst = float(burst)    # bucket size
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self):
+        """Returns: (allowed, seconds until the next token)"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, 0.0
+        return False, (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    One token bucket per key (the request's username, or client address).
+    Idle buckets are dropped once they would be full again anyway.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def check(self, key):
+        """Raises Rejected (429) when `key` is over its rate."""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+            allowed, wait = bucket.take()
+            if len(self._buckets) > 10000:
+                self._evict()
+        if not allowed:
+            raise Rejected("rate_limited", 429, wait)
+
+    def _evict(self):
+        full_after = self.burst / self.rate
+        now = time.monotonic()
+        for key in [k for k, b in self._buckets.items() if now - b.updated > full_after]:
+            del self._buckets[key]
+
+
+class AdmissionController:
+    """
+    Caps concurrent CPU-heavy work at `max_concurrent` with at most `max_queue`
+    callers waiting (FIFO) behind it. Anything beyond that, or anything that
+    waits longer than `max_wait` seconds, is refused with 503 straight away so
+    latency stays bounded instead of piling up behind the trainings.
+    """
+
+    def __init__(self, max_concurrent=2, max_queue=4, max_wait=60.0, service_estimate=30.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.running = 0
+        self._waiting = deque()
+        self._cond = threading.Condition()
+        self._avg_service = service_estimate  # seconds, EWMA of completed work
+
+    def _retry_after(self, ahead):
+        return self._avg_service * (ahead // self.max_concurrent + 1)
+
+    def reserve(self):
+        """Take a place in line without blocking. Returns: ticket for wait()."""
+        with self._cond:
+            if self.running < self.max_concurrent and not self._waiting:
+                self.running += 1
+                return {"admitted": True, "start": time.monotonic()}
+            if len(self._waiting) >= self.max_queue:
+                raise Rejected("server_busy", 503, self._retry_after(len(self._waiting)))
+            ticket = {"admitted": False, "start": None}
+            self._waiting.append(ticket)
+            return ticket
+
+    def wait(self, ticket, timeout=-1):
+        """Block until the ticket holds a slot; timeout=-1 uses max_wait, None waits forever."""
+        timeout = self.max_wait if timeout == -1 else timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not ticket["admitted"]:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._waiting.remove(ticket)
+                    raise Rejected("queue_timeout", 503, self._retry_after(len(self._waiting)))
+                self._cond.wait(remaining)
+        return ticket
+
+    def release(self, ticket):
+        with self._cond:
+            elapsed = time.monotonic() - ticket["start"]
+            self._avg_service = 0.8 * self._avg_service + 0.2 * elapsed
+            self.running -= 1
+            # hand the slot straight to the oldest waiter
+            if self._waiting:
+                nxt = self._waiting.popleft()
+                nxt["admitted"] = True
+                nxt["start"] = time.monotonic()
+                self.running += 1
+                self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, timeout=-1):
+        ticket = self.wait(self.reserve(), timeout)
+        try:
+            yield
+        finally:
+            self.release(ticket)
+
+    def stats(self):
+        with self._cond:
+            return {"running": self.running, "waiting": len(self._waiting),
+                    "avg_service_s": round(self._avg_service, 2)}
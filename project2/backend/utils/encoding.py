@@ -0,0 +1,80 @@
+# backend/utils/encoding.py
+"""
+Response formats for prediction payloads.
+
+JSON (default) keeps the original [{"date", "price"}, ...] lists. Clients that
+send `Accept: application/vnd.stock.columnar+json` get parallel "dates" and
+"prices" arrays instead, and `application/x-msgpack` gets the same columnar
+body as msgpack when the msgpack package is installed. Large bodies are
+gzip/brotli compressed according to Accept-Encoding.
+"""
+import gzip
+import json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON = "application/json"
+COLUMNAR_JSON = "application/vnd.stock.columnar+json"
+MSGPACK = "application/x-msgpack"
+
+COMPRESS_MIN_BYTES = 1024
+
+
+def offered_types():
+    return [JSON, COLUMNAR_JSON] + ([MSGPACK] if msgpack else [])
+
+
+def to_columns(preds_list):
+    """[{date, price}, ...] -> {"dates": [...], "prices": [...]}"""
+    return {
+        "dates": [p["date"] for p in preds_list],
+        "prices": [p["price"] for p in preds_list],
+    }
+
+
+def columnarize(body):
+    """Replace every "predictions" list in a response body (top level, job result, history) with columns."""
+    if not isinstance(body, dict):
+        return body
+    out = {}
+    for key, value in body.items():
+        if key == "predictions" and isinstance(value, list):
+            out.update(to_columns(value))
+        elif key == "result" and isinstance(value, dict):
+            out[key] = columnarize(value)
+        elif key == "history" and isinstance(value, list):
+            out[key] = [columnarize(item) for item in value]
+        else:
+            out[key] = value
+    return out
+
+
+def encode(body, mimetype):
+    """Returns: (bytes, content type)"""
+    if mimetype == MSGPACK and msgpack:
+        return msgpack.packb(columnarize(body), use_bin_type=True), MSGPACK
+    if mimetype == COLUMNAR_JSON:
+        body = columnarize(body)
+    else:
+        mimetype = JSON
+    return json.dumps(body, separators=(",", ":")).encode("utf-8"), mimetype
+
+
+def compress(data, accept_encoding):
+    """Returns: (bytes, content-encoding or None)"""
+    if len(data) < COMPRESS_MIN_BYTES or not accept_encoding:
+        return data, None
+    accepted = {e.split(";")[0].strip().lower() for e in accept_encoding.split(",")}
+    if brotli and "br" in accepted:
+        return brotli.compress(data, quality=5), "br"
+    if "gzip" in accepted:
+        return gzip.compress(data, compresslevel=6), "gzip"
+    return data, None
@@ -1,4 +1,6 @@
 # backend/utils/predictor.py
+import time
+
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler
 
@@ -15,6 +17,122 @@ def prepare_new_data(df_close):
     last_60 = scaled[-60:].reshape(1, 60, 1)
     return last_60, scaler
 
+def build_model():
+    """Same 2-layer LSTM architecture as training, compiled with mse/adam."""
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import LSTM, Dense
+
+    model = Sequential()
+    model.add(LSTM(50, return_sequences=True, input_shape=(60, 1)))
+    model.add(LSTM(50))
+    model.add(Dense(1))
+    model.compile(loss="mse", optimizer="adam")
+    return model
+
+def make_windows(scaled_all):
+    """
+    scaled_all: np array shape (n,1) of scaled closes
+    Returns: X shaped (n-60,60,1) and y shaped (n-60,)
+    """
+    X_all = []
+    y_all = []
+    for i in range(60, len(scaled_all)):
+        X_all.append(scaled_all[i-60:i, 0])
+        y_all.append(scaled_all[i, 0])
+    X_all = np.array(X_all).reshape(-1, 60, 1)
+    y_all = np.array(y_all)
+    return X_all, y_all
+
+def pick_batch_size(base, n_windows, budget_s):
+    """
+    Bigger batches mean fewer optimizer steps per epoch, so when the time
+    budget is tight trade some accuracy per epoch for getting epochs done.
+    """
+    steps = n_windows / base
+    if budget_s < 15 or steps > 40 * budget_s:
+        return base * 4
+    if budget_s < 40:
+        return base * 2
+    return base
+
+def train_within_budget(model, X_all, y_all, budget_s, batch_size=32, max_epochs=20,
+                        patience=2, val_split=0.1, on_epoch=None):
+    """
+    Fits on all but the newest windows until the validation loss plateaus,
+    the time budget would be exceeded by another epoch, or max_epochs; at
+    least one epoch always runs. Whatever stopped it, the weights of the
+    epoch with the lowest validation loss are restored and then trained for
+    one more epoch over every window, so the newest prices (which the
+    forecast starts from) are learned too. The budget keeps room for that pass.
+    on_epoch: optional callable(epoch, fraction_of_budget_or_epochs_used)
+    Returns: {"epochs", "best_epoch", "seconds", "loss", "val_loss", "batch_size", "stopped"}
+        with epochs counting the final pass, loss from the final pass and
+        val_loss the held-out loss of the best epoch
+    """
+    import tensorflow as tf
+
+    # most recent windows are held out, the rest is shuffled every epoch
+    n_val = max(1, int(len(X_all) * val_split))
+    X_tr, y_tr, X_val, y_val = X_all[:-n_val], y_all[:-n_val], X_all[-n_val:], y_all[-n_val:]
+    train_ds = (tf.data.Dataset.from_tensor_slices((X_tr.astype("float32"), y_tr.astype("float32")))
+                .shuffle(len(X_tr), reshuffle_each_iteration=True)
+                .batch(batch_size)
+                .prefetch(tf.data.AUTOTUNE))
+    val_ds = (tf.data.Dataset.from_tensor_slices((X_val.astype("float32"), y_val.astype("float32")))
+              .batch(batch_size)
+              .prefetch(tf.data.AUTOTUNE))
+    full_ds = (tf.data.Dataset.from_tensor_slices((X_all.astype("float32"), y_all.astype("float32")))
+               .shuffle(len(X_all), reshuffle_each_iteration=True)
+               .batch(batch_size)
+               .prefetch(tf.data.AUTOTUNE))
+
+    start = time.monotonic()
+    state = {"stopped": "max_epochs", "epochs": 0, "best": None}
+
+    class Budget(tf.keras.callbacks.Callback):
+        def on_epoch_end(self, epoch, logs=None):
+            logs = logs or {}
+            state["epochs"] = epoch + 1
+            best = state["best"]
+            if best is None or logs["val_loss"] < best["val_loss"]:
+                state["best"] = {"epoch": epoch + 1, "loss": logs["loss"], "val_loss": logs["val_loss"],
+                                 "weights": self.model.get_weights()}
+            elapsed = time.monotonic() - start
+            per_epoch = elapsed / (epoch + 1)
+            final_pass = per_epoch * len(X_all) / len(X_tr)
+            if on_epoch:
+                on_epoch(epoch, min(1.0, max(elapsed / budget_s, (epoch + 1) / max_epochs)))
+            if elapsed + per_epoch + final_pass > budget_s:
+                state["stopped"] = "budget"
+                self.model.stop_training = True
+
+        def on_train_end(self, logs=None):
+            # EarlyStopping only restores on its own stop; do it for every stop
+            if state["best"] is not None:
+                self.model.set_weights(state["best"]["weights"])
+
+    plateau = tf.keras.callbacks.EarlyStopping(monitor="val_loss", patience=patience)
+    model.fit(train_ds, validation_data=val_ds, epochs=max_epochs, verbose=0,
+              callbacks=[Budget(), plateau])
+    if plateau.stopped_epoch > 0:
+        state["stopped"] = "plateau"
+
+    # the held-out windows are the most recent ones; train on them too
+    final = model.fit(full_ds, epochs=1, verbose=0)
+    if on_epoch:
+        on_epoch(state["epochs"], 1.0)
+
+    best = state["best"]
+    return {
+        "epochs": state["epochs"] + 1,
+        "best_epoch": best["epoch"],
+        "seconds": round(time.monotonic() - start, 2),
+        "loss": round(float(final.history["loss"][-1]), 6),
+        "val_loss": round(float(best["val_loss"]), 6),
+        "batch_size": batch_size,
+        "stopped": state["stopped"],
+    }
+
 def predict_next_30(model, last_60, scaler):
     """
     model: compiled keras model
@@ -34,3 +152,17 @@ def predict_next_30(model, last_60, scaler):
     preds = np.array(preds).reshape(-1, 1)
     inv = scaler.inverse_transform(preds).reshape(-1)
     return inv
+
+def forecast(df_close, base_batch_size, budget_s, max_epochs=20, on_epoch=None):
+    """
+    Build, train within budget_s and roll 30 steps forward for one ticker
+    (what /predict does once the closes are loaded).
+    Returns: (numpy array of 30 predicted prices, training dict from train_within_budget)
+    """
+    last_60, scaler = prepare_new_data(df_close)
+    model = build_model()
+    X_all, y_all = make_windows(scaler.transform(df_close[["Close"]].values.astype(float)))
+    batch_size = pick_batch_size(base_batch_size, len(X_all), budget_s)
+    training = train_within_budget(model, X_all, y_all, budget_s, batch_size=batch_size,
+                                   max_epochs=max_epochs, on_epoch=on_epoch)
+    return predict_next_30(model, last_60, scaler), training
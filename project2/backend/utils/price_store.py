@@ -0,0 +1,272 @@
+# backend/utils/price_store.py
+import os
+import json
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: single process only
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_FIELDS = ("Close",)
+OHLCV_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+
+class PriceStore:
+    """
+    Historical prices kept as one memory-mapped float32 matrix per field.
+
+    Layout on disk (root directory):
+      index.json    -> origin date, fields, tickers (row order), capacities
+      <field>.f32   -> float32 matrix shaped (ticker_capacity, date_capacity)
+
+    Rows are tickers (ticker -> row through the index) and columns are
+    calendar days counted from `origin` (date -> column is plain arithmetic),
+    so different exchange calendars share the same axis and non-trading days
+    are NaN. Appending new days writes into the pre-allocated columns in place;
+    the files are only rewritten when the date capacity runs out (doubling).
+    Every process maps the same files and shares the OS page cache; slices
+    returned by get()/matrix() are zero-copy views. Writers take an exclusive
+    lock on index.lock and reload the index before changing it, so several
+    worker processes can append tickers without clobbering each other's rows;
+    pure readers can open the store with mode="r".
+    """
+
+    def __init__(self, root, fields=DEFAULT_FIELDS, origin="1990-01-01",
+                 mode="r+", ticker_capacity=64, date_capacity=None):
+        self.root = root
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._index_file = os.path.join(root, "index.json")
+        self._lock_file = os.path.join(root, "index.lock")
+        self._index_mtime = None
+        self._maps = {}
+        self.ticker_capacity = self.date_capacity = None
+
+        if mode == "r" and not os.path.exists(self._index_file):
+            raise FileNotFoundError(f"no price store at {root}")
+        os.makedirs(root, exist_ok=True)
+        with self._locked(reload=False):
+            if os.path.exists(self._index_file):
+                self._load_index()
+            else:
+                self._create(fields, origin, ticker_capacity, date_capacity)
+
+    def _create(self, fields, origin, ticker_capacity, date_capacity):
+        self.origin = pd.Timestamp(origin).normalize()
+        self.fields = list(fields)
+        self.tickers = []
+        self._rows = {}
+        self.ticker_capacity = int(ticker_capacity)
+        if date_capacity is None:
+            # cover origin -> today plus roughly two years of appends
+            date_capacity = (pd.Timestamp.today().normalize() - self.origin).days + 730
+        self.date_capacity = int(date_capacity)
+        for field in self.fields:
+            self._allocate(field, self.ticker_capacity, self.date_capacity)
+        self._save_index()
+
+    # ---------- index ----------
+    def _field_path(self, field):
+        return os.path.join(self.root, f"{field.lower()}.f32")
+
+    def _load_index(self):
+        with open(self._index_file, "r") as fp:
+            meta = json.load(fp)
+        shape = (meta["ticker_capacity"], meta["date_capacity"])
+        if shape != (self.ticker_capacity, self.date_capacity):
+            self._maps = {}  # another process grew the files, map them again
+        self.origin = pd.Timestamp(meta["origin"])
+        self.fields = meta["fields"]
+        self.tickers = meta["tickers"]
+        self.ticker_capacity, self.date_capacity = shape
+        self._rows = {t: i for i, t in enumerate(self.tickers)}
+        self._index_mtime = os.stat(self._index_file).st_mtime_ns
+
+    def _save_index(self):
+        meta = {
+            "origin": self.origin.strftime("%Y-%m-%d"),
+            "fields": self.fields,
+            "tickers": self.tickers,
+            "ticker_capacity": self.ticker_capacity,
+            "date_capacity": self.date_capacity,
+        }
+        tmp = self._index_file + ".tmp"
+        with open(tmp, "w") as fp:
+            json.dump(meta, fp)
+        os.replace(tmp, self._index_file)  # readers never see a half-written index
+        self._index_mtime = os.stat(self._index_file).st_mtime_ns
+
+    @contextmanager
+    def _locked(self, reload=True):
+        """Exclusive across threads and processes; the index is current inside."""
+        with self._lock:
+            with open(self._lock_file, "a") as lock_fp:
+                if fcntl:
+                    fcntl.flock(lock_fp, fcntl.LOCK_EX)
+                try:
+                    if reload:
+                        self._load_index()
+                    yield
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_fp, fcntl.LOCK_UN)
+
+    def refresh(self):
+        """Reload the index if another process changed it (new tickers, growth)."""
+        with self._lock:
+            if os.stat(self._index_file).st_mtime_ns != self._index_mtime:
+                self._load_index()
+
+    def __contains__(self, ticker):
+        if ticker not in self._rows:
+            self.refresh()
+        return ticker in self._rows
+
+    # ---------- memory maps ----------
+    def _allocate(self, field, rows, cols):
+        mm = np.memmap(self._field_path(field), dtype=np.float32, mode="w+", shape=(rows, cols))
+        mm[:] = np.nan
+        mm.flush()
+        del mm
+
+    def _map(self, field):
+        mm = self._maps.get(field)
+        if mm is None:
+            mode = "r" if self.mode == "r" else "r+"
+            mm = np.memmap(self._field_path(field), dtype=np.float32, mode=mode,
+                           shape=(self.ticker_capacity, self.date_capacity))
+            self._maps[field] = mm
+        return mm
+
+    def _grow_tickers(self):
+        # rows are contiguous, so adding rows only extends the file
+        new_cap = self.ticker_capacity * 2
+        for field in self.fields:
+            self._maps.pop(field, None)
+            path = self._field_path(field)
+            with open(path, "r+b") as fp:
+                fp.truncate(new_cap * self.date_capacity * 4)
+            mm = np.memmap(path, dtype=np.float32, mode="r+", shape=(new_cap, self.date_capacity))
+            mm[self.ticker_capacity:] = np.nan
+            mm.flush()
+            del mm
+        self.ticker_capacity = new_cap
+
+    def _grow_dates(self, needed):
+        # columns are strided, so this is the one case that rewrites the files
+        new_cap = max(needed, self.date_capacity * 2)
+        for field in self.fields:
+            old = self._map(field)
+            self._maps.pop(field, None)
+            path = self._field_path(field)
+            tmp = path + ".tmp"
+            mm = np.memmap(tmp, dtype=np.float32, mode="w+", shape=(self.ticker_capacity, new_cap))
+            mm[:] = np.nan
+            mm[:, :self.date_capacity] = old
+            mm.flush()
+            del mm, old
+            os.replace(tmp, path)
+        self.date_capacity = new_cap
+
+    # ---------- lookups ----------
+    def row(self, ticker):
+        return self._row_of(ticker)
+
+    def _row_of(self, ticker):
+        # one stat() per read picks up tickers and growth from other processes
+        self.refresh()
+        return self._rows[ticker]
+
+    def column(self, date):
+        return (pd.Timestamp(date).normalize() - self.origin).days
+
+    def _span(self, start, end):
+        c0 = 0 if start is None else max(self.column(start), 0)
+        c1 = self.date_capacity if end is None else min(self.column(end) + 1, self.date_capacity)
+        return c0, max(c0, c1)
+
+    def dates(self, start=None, end=None):
+        c0, c1 = self._span(start, end)
+        return self.origin + pd.to_timedelta(np.arange(c0, c1), unit="D")
+
+    # ---------- writes ----------
+    def upsert(self, ticker, df):
+        """
+        df: DataFrame indexed by date with (some of) the store's fields as columns,
+            as returned by yf.download (single-level or (field, ticker) columns).
+        Writes only the columns covered by df; rows before `origin` are ignored.
+        """
+        if self.mode == "r":
+            raise PermissionError("price store opened read-only")
+        if df is None or df.empty:
+            return
+
+        idx = pd.DatetimeIndex(df.index)
+        if idx.tz is not None:
+            idx = idx.tz_localize(None)
+        cols = (idx.normalize() - self.origin).days.values
+        keep = cols >= 0
+        cols = cols[keep]
+        if len(cols) == 0:
+            return
+
+        with self._locked():
+            if ticker not in self._rows:
+                if len(self.tickers) >= self.ticker_capacity:
+                    self._grow_tickers()
+                self.tickers.append(ticker)
+                self._rows[ticker] = len(self.tickers) - 1
+                dirty = True
+            else:
+                dirty = False
+            if cols.max() >= self.date_capacity:
+                self._grow_dates(int(cols.max()) + 1)
+                dirty = True
+            if dirty:
+                self._save_index()
+
+            r = self._rows[ticker]
+            for field in self.fields:
+                if field not in df.columns:
+                    continue
+                values = np.asarray(df[field], dtype=np.float32).reshape(len(df), -1)[:, 0]
+                mm = self._map(field)
+                mm[r, cols] = values[keep]
+                mm.flush()
+
+    # ---------- reads ----------
+    def get(self, ticker, field="Close", start=None, end=None):
+        """Zero-copy float32 view of one ticker's row (NaN on non-trading days)."""
+        r = self._row_of(ticker)
+        c0, c1 = self._span(start, end)
+        return self._map(field)[r, c0:c1]
+
+    def matrix(self, field="Close", start=None, end=None):
+        """Zero-copy (n_tickers, n_days) view across the whole universe."""
+        self.refresh()
+        c0, c1 = self._span(start, end)
+        return self._map(field)[:len(self.tickers), c0:c1]
+
+    def frame(self, ticker, fields=None, start=None, end=None):
+        """
+        Returns: DataFrame for one ticker with a DatetimeIndex and trading days only
+        (a copy; use get() when a view is enough).
+        """
+        fields = fields or self.fields
+        r = self._row_of(ticker)
+        c0, c1 = self._span(start, end)
+        data = {f: self._map(f)[r, c0:c1] for f in fields}
+        df = pd.DataFrame(data, index=self.dates(start, end))
+        return df.dropna(how="all")
+
+    def last_date(self, ticker):
+        row = self.get(ticker)
+        filled = np.flatnonzero(~np.isnan(row))
+        if len(filled) == 0:
+            return None
+        return self.origin + pd.Timedelta(days=int(filled[-1]))
@@ -0,0 +1,70 @@
+# backend/utils/scheduler.py
+import os
+
+POLICIES = ("throughput", "latency")
+
+
+def available_cores():
+    """CPUs this process may run on (respects taskset / container cpusets)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def plan_training(policy="latency", cores=None, max_jobs=None):
+    """
+    Split the cores between concurrent trainings.
+
+    throughput: many jobs with 2 threads each and bigger batches, so the
+                small LSTM keeps every core busy with independent work
+    latency:    few jobs that each get a large share of the cores and the
+                original batch size, so a single forecast returns sooner
+    Returns: {"policy", "cores", "jobs", "threads_per_job", "batch_size"}
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"unknown scheduling policy {policy!r}, expected one of {POLICIES}")
+    cores = cores or available_cores()
+
+    if policy == "throughput":
+        threads = min(2, cores)
+        jobs = max(1, cores // threads)
+        batch_size = 64
+    else:
+        jobs = max(1, min(2, cores // 4))
+        threads = max(1, cores // jobs)
+        batch_size = 32
+
+    if max_jobs:
+        jobs = max(1, min(jobs, max_jobs))
+        threads = max(threads, cores // jobs)
+
+    return {
+        "policy": policy,
+        "cores": cores,
+        "jobs": jobs,
+        "threads_per_job": threads,
+        "batch_size": batch_size,
+    }
+
+
+def configure_tensorflow(plan, worker_index):
+    """
+    Set up a training worker process (see utils.training_pool): pin it to
+    its own slice of cores and size TensorFlow's thread pools to match. TF
+    reads them once, so call this before any model is built.
+    """
+    import tensorflow as tf
+    pin_worker(worker_index, plan)
+    tf.config.threading.set_intra_op_parallelism_threads(plan["threads_per_job"])
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def pin_worker(worker_index, plan):
+    """Restrict this process to cores [i*threads, (i+1)*threads) of the allowed set."""
+    if not hasattr(os, "sched_setaffinity"):
+        return
+    allowed = sorted(os.sched_getaffinity(0))
+    n = plan["threads_per_job"]
+    start = (worker_index % plan["jobs"]) * n
+    os.sched_setaffinity(0, allowed[start:start + n] or allowed)
@@ -0,0 +1,118 @@
+# backend/utils/training_pool.py
+"""
+Training in worker processes, one per concurrent job of the training plan.
+
+Worker i pins itself to its own slice of cores and sizes TensorFlow's
+thread pools to threads_per_job, so trainings running at the same time do
+not share cores. Everything else (routes, jobs, caches, admission control)
+stays in the one Flask process; a caller holds a worker for the length of
+one forecast, and admission control makes sure no more than plan["jobs"]
+callers ask at once.
+"""
+import logging
+import multiprocessing
+import queue
+import threading
+
+from utils.scheduler import configure_tensorflow
+
+logger = logging.getLogger(__name__)
+
+
+class TrainingError(Exception):
+    pass
+
+
+def _worker_main(index, plan, conn):
+    # TensorFlow reads its thread settings once, before the first op
+    configure_tensorflow(plan, index)
+    from utils.predictor import forecast
+
+    conn.send(("ready",))
+    while True:
+        try:
+            df_close, budget_s, max_epochs = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        try:
+            preds, training = forecast(
+                df_close, plan["batch_size"], budget_s, max_epochs,
+                on_epoch=lambda epoch, used: conn.send(("epoch", epoch, used)),
+            )
+            conn.send(("done", preds, training))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class TrainingPool:
+    def __init__(self, plan, start_method="spawn"):
+        self.plan = plan
+        self._ctx = multiprocessing.get_context(start_method)
+        self._workers = [None] * plan["jobs"]  # index -> (process, connection)
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+
+    def _spawn(self, index):
+        parent, child = self._ctx.Pipe()
+        proc = self._ctx.Process(target=_worker_main, args=(index, self.plan, child),
+                                 name=f"training-worker-{index}", daemon=True)
+        proc.start()
+        child.close()
+        if parent.recv()[0] != "ready":
+            raise TrainingError(f"training worker {index} failed to start")
+        self._workers[index] = (proc, parent)
+
+    def start(self):
+        """Start the workers (once; later calls return straight away)."""
+        with self._lock:
+            if self._started:
+                return
+            for i in range(self.plan["jobs"]):
+                self._spawn(i)
+                self._idle.put(i)
+            self._started = True
+            logger.info(f"Started {self.plan['jobs']} training worker(s), "
+                        f"{self.plan['threads_per_job']} core(s) each")
+
+    def forecast(self, df_close, budget_s, max_epochs=20, on_epoch=None):
+        """
+        Train and forecast one ticker in an idle worker (blocks until one is free).
+        on_epoch: optional callable(epoch, fraction_used), called in this process
+        Returns: (numpy array of 30 predicted prices, training dict)
+        """
+        self.start()
+        index = self._idle.get()
+        proc, conn = self._workers[index]
+        try:
+            conn.send((df_close, budget_s, max_epochs))
+            while True:
+                kind, *payload = conn.recv()
+                if kind == "epoch":
+                    if on_epoch:
+                        try:
+                            on_epoch(*payload)
+                        except Exception:
+                            logger.exception("on_epoch callback failed")
+                elif kind == "done":
+                    return payload[0], payload[1]
+                else:
+                    raise TrainingError(payload[0])
+        except (EOFError, OSError):
+            # the worker died mid-job (e.g. killed for memory); replace it
+            proc.join(5)
+            with self._lock:
+                self._spawn(index)
+            raise TrainingError(f"training worker {index} exited with code {proc.exitcode}")
+        finally:
+            self._idle.put(index)
+
+    def close(self):
+        with self._lock:
+            for entry in self._workers:
+                if entry:
+                    entry[1].close()
+                    entry[0].join(5)
+            self._workers = [None] * self.plan["jobs"]
+            self._idle = queue.Queue()
+            self._started = False
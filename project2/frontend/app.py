@@ -1,14 +1,19 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 import plotly.graph_objects as go
 import time
-import yfinance as yf
+
+from utils.data import load_prices
 
 
 
 # ----------------------------- API -----------------------------
 API = "http://localhost:5000"
+POLL_INTERVAL = 1.0  # seconds between /predict/jobs status checks
+COLUMNAR_JSON = "application/vnd.stock.columnar+json"
 st.set_page_config(page_title="AI Stock Predictor", layout="wide")
 
 # ----------------------------- CSS -----------------------------
@@ -30,17 +35,84 @@ input, textarea, .stTextInput { color: Black !important; }
 """, unsafe_allow_html=True)
 
 # ----------------------------- API Helper -----------------------------
-def api_post(endpoint, payload):
+@st.cache_resource
+def get_session():
+    """One keep-alive connection pool shared by every script run and session."""
+    session = requests.Session()
+    # columnar prediction payloads, plain JSON from older backends
+    session.headers["Accept"] = f"{COLUMNAR_JSON}, application/json;q=0.9"
+    session.headers["Accept-Encoding"] = "gzip, deflate"
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504),
+                  allowed_methods=frozenset(["GET"]))
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def _api_call(method, endpoint, timeout, **kwargs):
     try:
-        r = requests.post(f"{API}{endpoint}", json=payload, timeout=210)
-        if r.status_code in (200, 201):
+        r = get_session().request(method, f"{API}{endpoint}", timeout=timeout, **kwargs)
+        if r.status_code in (200, 201, 202):
             return r.json(), None
         try:
-            return None, r.json()
+            err = r.json()
         except:
-            return None, {"error": r.text}
+            err = {"error": r.text}
+        err["status_code"] = r.status_code
+        return None, err
     except Exception as e:
-        return None, {"error": str(e)}
+        return None, {"error": str(e), "status_code": None}
+
+def predictions_frame(body):
+    """DataFrame(date, price) from a columnar body, or from row dicts."""
+    if "dates" in body:
+        return pd.DataFrame({"date": body["dates"], "price": body["prices"]})
+    return pd.DataFrame(body["predictions"])
+
+def api_post(endpoint, payload, timeout=30):
+    return _api_call("POST", endpoint, timeout, json=payload)
+
+def api_get(endpoint, timeout=30):
+    return _api_call("GET", endpoint, timeout)
+
+def get_history(ticker):
+    try:
+        df = load_prices(ticker, period="1y", interval="1d")
+        if df.empty:
+            return None
+        return df[["Close"]].reset_index()
+    except:
+        return None
+
+HISTORY_PAGE_SIZE = 20
+
+def load_history_page(user, cursor=None):
+    """Append one page of history summaries (newest first) to session state."""
+    endpoint = f"/history/{user}?summary=1&limit={HISTORY_PAGE_SIZE}"
+    if cursor is not None:
+        endpoint += f"&cursor={cursor}"
+    data, err = api_get(endpoint)
+    if err:
+        st.error(err.get("error"))
+        return
+    st.session_state["history_items"].extend(data.get("history", []))
+    st.session_state["history_cursor"] = data.get("next_cursor")
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def fetch_ticker_history(user, ticker, newest_id, count):
+    """
+    Full entries for one ticker, following next_cursor past the backend's
+    page limit. History is append-only, so (newest_id, count) pins the
+    result; errors raise and are not cached.
+    """
+    entries, cursor = [], newest_id + 1
+    while cursor is not None and len(entries) < count:
+        data, err = api_get(f"/history/{user}?ticker={ticker}&cursor={cursor}&limit={count - len(entries)}")
+        if err:
+            raise RuntimeError(err.get("error"))
+        entries.extend(data.get("history", []))
+        cursor = data.get("next_cursor")
+    return entries
 
 # ----------------------------- Graphs -----------------------------
 def plot_prediction(df_pred, ticker):
@@ -69,6 +141,19 @@ def plot_history(df_hist, df_pred, ticker):
                       height=500)
     st.plotly_chart(fig, use_container_width=True)
 
+def plot_history_overlay(entries, ticker):
+    fig = go.Figure()
+    for item in entries:
+        df = predictions_frame(item)
+        fig.add_trace(go.Scatter(
+            x=df["date"], y=df["price"],
+            mode='lines', name=item["timestamp"][:16].replace("T", " "), line=dict(width=2)
+        ))
+    fig.update_layout(template="plotly_dark",
+                      title=f"{ticker} - Forecasts Over Time",
+                      height=450)
+    st.plotly_chart(fig, use_container_width=True)
+
 # ----------------------------- Sidebar -----------------------------
 st.sidebar.title("📊 Navigation")
 page = st.sidebar.radio("Go to:", [ "Signup","Login", "Dashboard", "History", "Profile"])
@@ -127,45 +212,76 @@ elif page == "Dashboard":
          #   if "." not in ticker and ticker.isalpha() and 2 <= len(ticker) <= 6:
           #      ticker = ticker + ".NS"  # Auto add NSE suffix
 
-            st.info(f"Predicting for **{ticker}** ... Please wait ⏳")
-
-            # --------- PREDICTION API CALL ----------
-            data, err = api_post("/predict", {"ticker": ticker, "username": st.session_state["user"]})
+            # --------- SUBMIT PREDICTION JOB ----------
+            data, err = api_post("/predict/jobs", {"ticker": ticker, "username": st.session_state["user"]})
             if data:
-                preds = data["predictions"]
-                df_pred = pd.DataFrame(preds)
+                st.session_state["predict_job"] = {"id": data["job_id"], "ticker": ticker}
+                st.session_state.pop("last_prediction", None)
+            elif err.get("retry_after"):
+                st.warning(f"Backend is busy ({err.get('error')}). Try again in {err['retry_after']} s.")
+            else:
+                st.error(err.get("error"))
 
-                st.subheader("📅 Prediction Table")
-                st.dataframe(df_pred, use_container_width=True)
-                plot_prediction(df_pred, ticker)
+        # --------- POLL RUNNING JOB ----------
+        job = st.session_state.get("predict_job")
+        if job:
+            status, err = api_get(f"/predict/jobs/{job['id']}", timeout=10)
+            if err and err.get("status_code") == 404:
+                # the backend restarted or the job expired
+                st.session_state.pop("predict_job", None)
+                st.error(err.get("error"))
+            elif err:
+                # timeout or connection blip: keep the job and poll again
+                st.warning(f"Waiting for the backend to answer ({err.get('error')}) ... retrying ⏳")
+                time.sleep(POLL_INTERVAL)
+                st.rerun()
+            elif status["status"] in ("queued", "running"):
+                st.info(f"Predicting for **{job['ticker']}** ... {status.get('stage', 'queued')} ⏳")
+                st.progress(float(status.get("progress", 0.0)))
+                time.sleep(POLL_INTERVAL)
+                st.rerun()
+            elif status["status"] == "done":
+                st.session_state.pop("predict_job", None)
+                st.session_state.pop("history_items", None)  # History page reloads with it
+                st.session_state["last_prediction"] = status["result"]
+            else:
+                st.session_state.pop("predict_job", None)
+                failure = status.get("error") or {}
+                if failure.get("retry_after"):
+                    st.warning(f"Backend is busy ({failure['error']}). Try again in {failure['retry_after']} s.")
+                else:
+                    st.error(failure.get("error", "prediction_failed"))
 
-                # --------- HISTORICAL DATA ----------
-                st.subheader("📉 Past 1 Year + Prediction")
+        result = st.session_state.get("last_prediction")
+        if result:
+            ticker = result["ticker"]
+            df_pred = predictions_frame(result)
 
-                @st.cache_data(ttl=3600)
-                def get_history(ticker):
-                    try:
-                        df = yf.download(ticker, period="1y", interval="1d")
-                        if df.empty:
-                            return None
-                        df = df[["Close"]].reset_index()
-                        return df
-                    except:
-                        return None
+            st.subheader("📅 Prediction Table")
+            training = result.get("training")
+            if training:
+                st.caption(f"Trained {training['epochs']} epoch(s) in {training['seconds']} s "
+                           f"(batch {training['batch_size']}, val loss {training['val_loss']} "
+                           f"from epoch {training.get('best_epoch', training['epochs'])}, "
+                           f"stopped on {training['stopped']})")
+            elif result.get("cached"):
+                st.caption("Served from a recent forecast for this ticker.")
+            st.dataframe(df_pred, use_container_width=True)
+            plot_prediction(df_pred, ticker)
 
-                df_hist = get_history(ticker)
+            # --------- HISTORICAL DATA ----------
+            st.subheader("📉 Past 1 Year + Prediction")
 
-                if df_hist is None or df_hist.empty:
-                    st.warning("Historical data not available. Using prediction as history.")
-                    # Use prediction dates and prices as pseudo-history
-                    df_hist = df_pred.copy()
-                    df_hist.rename(columns={"date": "Date", "price": "Close"}, inplace=True)
+            df_hist = get_history(ticker)
 
-                st.write(df_hist.head())  # Optional: debug
-                plot_history(df_hist, df_pred, ticker)
+            if df_hist is None or df_hist.empty:
+                st.warning("Historical data not available. Using prediction as history.")
+                # Use prediction dates and prices as pseudo-history
+                df_hist = df_pred.copy()
+                df_hist.rename(columns={"date": "Date", "price": "Close"}, inplace=True)
 
-            else:
-                st.error(err.get("error"))
+            st.write(df_hist.head())  # Optional: debug
+            plot_history(df_hist, df_pred, ticker)
 
         st.markdown("</div>", unsafe_allow_html=True)
 
@@ -176,19 +292,38 @@ elif page == "History":
         st.stop()
 
     st.markdown("<h1 class='big-title'>Prediction History</h1>", unsafe_allow_html=True)
-    r = requests.get(f"{API}/history/{st.session_state['user']}")
-    if r.status_code == 200:
-        history = r.json().get("history", [])
-        if not history:
-            st.info("No history available.")
-        else:
-            for item in reversed(history):
-                st.markdown("<div class='card'>", unsafe_allow_html=True)
-                st.write(f"**Ticker:** {item['ticker']} — {item['timestamp']}")
-                df = pd.DataFrame(item["predictions"])
-                st.dataframe(df, use_container_width=True)
-                plot_prediction(df, item["ticker"])
-                st.markdown("</div>", unsafe_allow_html=True)
+    user = st.session_state["user"]
+
+    if st.button("Refresh") or "history_items" not in st.session_state:
+        st.session_state["history_items"] = []
+        st.session_state["history_cursor"] = None
+        load_history_page(user)
+
+    items = st.session_state["history_items"]
+    if not items:
+        st.info("No history available.")
+    else:
+        # compact table first, no prediction arrays are fetched for it
+        df_summary = pd.DataFrame(items)[["timestamp", "ticker", "start_date", "end_date", "start_price", "end_price"]]
+        st.dataframe(df_summary, use_container_width=True)
+
+        if st.session_state["history_cursor"] is not None and st.button("Load more"):
+            load_history_page(user, st.session_state["history_cursor"])
+            st.rerun()
+
+        # one overlaid chart per ticker, fetched only when asked for
+        by_ticker = {}
+        for item in items:
+            by_ticker.setdefault(item["ticker"], []).append(item)
+        for ticker, entries in by_ticker.items():
+            with st.expander(f"{ticker} — {len(entries)} forecast(s)"):
+                if st.checkbox("Show chart", key=f"history_chart_{ticker}"):
+                    try:
+                        full = fetch_ticker_history(user, ticker, entries[0]["id"], len(entries))
+                    except RuntimeError as e:
+                        st.error(str(e))
+                    else:
+                        plot_history_overlay(full, ticker)
 
 # ----------------------------- PROFILE -----------------------------
 elif page == "Profile":
@@ -1,10 +1,12 @@
 # streamlit_stock_recommender.py
 
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import warnings
 
+from utils.data import get_fundamentals_store, load_history
+from utils.fundamentals import score_fundamentals
+
 # Suppress warnings
 warnings.filterwarnings("ignore", category=FutureWarning)
 st.set_page_config(
@@ -26,49 +28,10 @@ STOCKS_TO_SCAN = [
     'SBIN.NS', 'LT.NS'
 ]
 
-# --- Functions ---
-def get_stock_data(ticker):
-    stock = yf.Ticker(ticker)
-    try:
-        info = stock.info
-        hist = stock.history(period="1y")
-        if info.get('regularMarketPrice') is None or hist.empty:
-            return None, None
-        return info, hist
-    except:
-        return None, None
-
-def analyze_fundamentals(info):
-    score = 0
-    reasons = {}
-
-    pe_ratio = info.get('trailingPE')
-    if pe_ratio and 0 < pe_ratio < 25:
-        score += 1
-    reasons['P/E Ratio'] = f"{pe_ratio:.2f}" if pe_ratio else "N/A"
-
-    pb_ratio = info.get('priceToBook')
-    if pb_ratio and 0 < pb_ratio < 3:
-        score += 1
-    reasons['P/B Ratio'] = f"{pb_ratio:.2f}" if pb_ratio else "N/A"
-
-    de_ratio = info.get('debtToEquity')
-    if de_ratio and de_ratio < 100:
-        score += 1
-    reasons['Debt/Equity'] = f"{de_ratio/100:.2f}" if de_ratio else "N/A"
-
-    roe = info.get('returnOnEquity')
-    if roe and roe > 0.15:
-        score += 1
-    reasons['Return on Equity'] = f"{roe:.2%}" if roe else "N/A"
-
-    eps = info.get('trailingEps')
-    if eps and eps > 0:
-        score += 1
-    reasons['EPS'] = f"{eps:.2f}" if eps else "N/A"
-
-    return score, reasons
+# keep the universe's fundamentals snapshots fresh in the background
+get_fundamentals_store().start_background_refresh(STOCKS_TO_SCAN)
 
+# --- Functions ---
 def analyze_technicals(hist):
     score = 0
     reasons = {}
@@ -102,27 +65,34 @@ def find_best_stock(risk_profile):
     progress_text = st.empty()
     progress_bar = st.progress(0)
 
-    for i, ticker in enumerate(STOCKS_TO_SCAN):
-        info, hist = get_stock_data(ticker)
-        if not info:
+    # fundamentals for the whole universe come from today's snapshot table
+    store = get_fundamentals_store()
+    store.refresh(STOCKS_TO_SCAN)
+    fundamentals = store.table(STOCKS_TO_SCAN)
+    f_scores, f_reasons = score_fundamentals(fundamentals)
+    companies = fundamentals['shortName'].fillna(pd.Series(fundamentals.index, index=fundamentals.index))
+
+    for i, ticker in enumerate(fundamentals.index):
+        hist = load_history(ticker, period="1y")
+        if hist.empty:
             continue
 
-        f_score, f_reasons = analyze_fundamentals(info)
+        f_score = int(f_scores[ticker])
         t_score, t_reasons = analyze_technicals(hist)
 
         analyzed_stocks.append({
             'Ticker': ticker,
-            'Company': info.get('shortName', ticker),
-            'Price': info.get('regularMarketPrice', 0),
+            'Company': companies[ticker],
+            'Price': float(fundamentals.at[ticker, 'regularMarketPrice']),
             'Fundamental Score': f_score,
             'Technical Score': t_score,
             'Total Score': f_score + t_score,
-            'Fundamental Details': f_reasons,
+            'Fundamental Details': f_reasons.loc[ticker].to_dict(),
             'Technical Details': t_reasons
         })
 
-        progress_text.text(f"Scanning {i+1}/{len(STOCKS_TO_SCAN)}: {ticker}")
-        progress_bar.progress((i+1)/len(STOCKS_TO_SCAN))
+        progress_text.text(f"Scanning {i+1}/{len(fundamentals)}: {ticker}")
+        progress_bar.progress((i+1)/len(fundamentals))
 
     progress_text.text("✅ Analysis complete!")
     progress_bar.empty()
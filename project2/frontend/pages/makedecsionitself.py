@@ -1,12 +1,13 @@
 # streamlit_stock_analysis_with_chart.py
 
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import warnings
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from utils.data import get_stock_data
+
 warnings.filterwarnings("ignore", category=FutureWarning)
 st.set_page_config(
     page_title="Let model to decied stock name",
@@ -29,17 +30,6 @@ risk_profile = st.selectbox(
 )
 
 # --- Functions ---
-def get_stock_data(ticker):
-    stock = yf.Ticker(ticker)
-    try:
-        info = stock.info
-        hist = stock.history(period="1y")
-        if info.get('regularMarketPrice') is None or hist.empty:
-            return None, None
-        return info, hist
-    except:
-        return None, None
-
 def analyze_fundamentals(info):
     score = 0
     reasons = {}
@@ -1,7 +1,10 @@
+import os
+
 import streamlit as st
-import requests
 import pandas as pd
 
+from utils.news import MARKETAUX_URL, MarketauxClient, NewsFetchError, NewsService
+
 # --------------------------- Page Config ---------------------------
 st.set_page_config(
     page_title="Stock & Market News",
@@ -25,32 +28,26 @@ with col2:
     get_news_clicked = st.button("Get News")
 
 # --------------------------- API Token ---------------------------
-API_TOKEN = "cmeIXBuOBJ2o0PQK9lCJTwewYfUPnbiqXoF8UNX4"
+API_TOKEN = os.environ.get("MARKETAUX_TOKEN", "cmeIXBuOBJ2o0PQK9lCJTwewYfUPnbiqXoF8UNX4")
+NEWS_URL = os.environ.get("MARKETAUX_URL", MARKETAUX_URL)
 
 # --------------------------- Function to Fetch News ---------------------------
+@st.cache_resource
+def get_news_service():
+    """One service (cache + in-flight requests) shared by every session."""
+    service = NewsService(MarketauxClient(API_TOKEN, base_url=NEWS_URL), ttl=300)
+    service.start_prefetch(limit=20)
+    return service
+
 def get_marketaux_news(ticker=None, max_articles=20):
     """
-    Fetch news from Marketaux API.
+    Fetch news from Marketaux API through the shared news service.
     If ticker is None, returns trending news.
     """
-    base_url = "https://api.marketaux.com/v1/news/all"
-    params = {
-        "api_token": API_TOKEN,
-        "language": "en",
-        "limit": max_articles
-    }
-    if ticker:
-        params["symbols"] = ticker.upper()
-
     try:
-        response = requests.get(base_url, params=params, timeout=10)
-        if response.status_code != 200:
-            st.error(f"Error fetching news: {response.status_code} - {response.text}")
-            return []
-        data = response.json()
-        return data.get("data", [])
-    except requests.exceptions.RequestException as e:
-        st.error(f"Network error: {e}")
+        return get_news_service().get(symbols=ticker, limit=max_articles)
+    except NewsFetchError as e:
+        st.error(str(e))
         return []
 
 # --------------------------- Display News ---------------------------
@@ -1,11 +1,13 @@
 # streamlit_stock_dashboard.py
 
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from utils.data import load_prices
+from utils.downsample import CANDLE_NAMES, lttb, resample_ohlc, pick_candle_rule
+
 st.set_page_config(page_title="Stock Analysis Dashboard", layout="wide")
 
 st.title("📈 Stock Analysis Dashboard")
@@ -18,7 +20,7 @@ end_date = st.date_input("End Date", pd.to_datetime("2023-11-17"))
 
 # --- Fetch Data ---
 if ticker:
-    data = yf.download(ticker, start=start_date, end=end_date)
+    data = load_prices(ticker, start=start_date, end=end_date)
     
     if data.empty:
         st.error("No data found for this ticker or date range.")
@@ -54,18 +56,36 @@ if ticker:
         }
         st.dataframe(pd.DataFrame([summary]))
 
+        # --- Visible Window ---
+        # indicators above use the full series; only what is drawn is reduced
+        first_day, last_day = data.index[0].date(), data.index[-1].date()
+        if first_day < last_day:
+            window = st.slider("Zoom window", min_value=first_day, max_value=last_day,
+                               value=(first_day, last_day))
+            view = data.loc[str(window[0]):str(window[1])]
+        else:
+            view = data
+
+        label, rule = pick_candle_rule(view.index)
+        candles = view if rule is None else resample_ohlc(view, rule)
+        if rule is not None:
+            st.caption(f"{len(view)} daily candles shown as {len(candles)} "
+                       f"{CANDLE_NAMES[label]} candles; "
+                       "narrow the zoom window for full resolution.")
+        ma100, ma200, rsi = lttb(view['MA100']), lttb(view['MA200']), lttb(view['RSI'])
+
         # --- Plot Chart ---
         fig = make_subplots(rows=2, cols=1, shared_xaxes=True,
                             vertical_spacing=0.1, row_heights=[0.7, 0.3])
 
         # Top Panel: Candlestick + MA100 + MA200
-        fig.add_trace(go.Candlestick(x=data.index, open=data['Open'], high=data['High'],
-                                     low=data['Low'], close=data['Close'], name='Candlestick'), row=1, col=1)
-        fig.add_trace(go.Scatter(x=data.index, y=data['MA100'], line=dict(color='blue', width=1), name='MA100'), row=1, col=1)
-        fig.add_trace(go.Scatter(x=data.index, y=data['MA200'], line=dict(color='orange', width=1), name='MA200'), row=1, col=1)
+        fig.add_trace(go.Candlestick(x=candles.index, open=candles['Open'], high=candles['High'],
+                                     low=candles['Low'], close=candles['Close'], name='Candlestick'), row=1, col=1)
+        fig.add_trace(go.Scatter(x=ma100.index, y=ma100, line=dict(color='blue', width=1), name='MA100'), row=1, col=1)
+        fig.add_trace(go.Scatter(x=ma200.index, y=ma200, line=dict(color='orange', width=1), name='MA200'), row=1, col=1)
 
         # Bottom Panel: RSI
-        fig.add_trace(go.Scatter(x=data.index, y=data['RSI'], line=dict(color='red', width=1), name='RSI'), row=2, col=1)
+        fig.add_trace(go.Scatter(x=rsi.index, y=rsi, line=dict(color='red', width=1), name='RSI'), row=2, col=1)
         fig.add_hline(y=70, line_dash="dash", line_color="grey", row=2, col=1)  # Overbought line
         fig.add_hline(y=30, line_dash="dash", line_color="grey", row=2, col=1)  # Oversold line
 
@@ -0,0 +1,120 @@
+# frontend/tests/test_news.py
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.news import MarketauxClient, NewsFetchError, NewsService
+
+
+class StubMarketaux:
+    """Local stand-in for the Marketaux endpoint; counts calls and replays `status`/`body`."""
+
+    def __init__(self):
+        self.calls = 0
+        self.status = 200
+        self.body = {"data": []}
+        self.gate = threading.Event()
+        self.gate.set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.calls += 1
+                stub.gate.wait(5)
+                raw = stub.body if isinstance(stub.body, bytes) else json.dumps(stub.body).encode()
+                self.send_response(stub.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v1/news/all"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def stub():
+    s = StubMarketaux()
+    yield s
+    s.gate.set()
+    s.server.shutdown()
+    s.server.server_close()
+
+
+def articles(*urls):
+    return {"data": [{"title": f"story {i}", "url": u} for i, u in enumerate(urls)]}
+
+
+def test_concurrent_gets_share_one_upstream_call(stub):
+    stub.body = articles("https://a", "https://b")
+    stub.gate.clear()  # hold the first request open until every caller is waiting
+    service = NewsService(MarketauxClient("token", base_url=stub.url))
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.get("AAPL"))) for _ in range(10)]
+    for t in threads:
+        t.start()
+    time.sleep(0.2)
+    stub.gate.set()
+    for t in threads:
+        t.join(5)
+
+    assert stub.calls == 1
+    assert len(results) == 10
+    assert all(r == results[0] for r in results)
+    # same symbols in another order and case are the same cache key
+    assert service.get("aapl") == results[0]
+    assert stub.calls == 1
+
+
+def test_failure_is_cached_for_failure_ttl(stub):
+    stub.status, stub.body = 500, {"error": "down"}
+    service = NewsService(MarketauxClient("token", base_url=stub.url), failure_ttl=0.3)
+
+    with pytest.raises(NewsFetchError):
+        service.get("TSLA")
+    with pytest.raises(NewsFetchError):
+        service.get("TSLA")
+    assert stub.calls == 1
+
+    time.sleep(0.4)
+    stub.status, stub.body = 200, articles("https://c")
+    assert [a["url"] for a in service.get("TSLA")] == ["https://c"]
+    assert stub.calls == 2
+
+
+def test_stale_articles_served_over_an_error(stub):
+    stub.body = articles("https://old")
+    service = NewsService(MarketauxClient("token", base_url=stub.url), ttl=0.2, failure_ttl=5)
+    first = service.get()
+
+    time.sleep(0.3)
+    stub.status, stub.body = 503, {"error": "busy"}
+    assert service.get() == first
+    assert service.get() == first  # the failure is remembered, no second call
+    assert stub.calls == 2
+
+
+def test_non_json_response_raises_fetch_error(stub):
+    stub.body = b"<html>maintenance</html>"
+    service = NewsService(MarketauxClient("token", base_url=stub.url))
+    with pytest.raises(NewsFetchError):
+        service.get("MSFT")
+
+
+def test_articles_deduplicated_by_url(stub):
+    stub.body = articles("https://a", "https://b", "https://a", None, None)
+    service = NewsService(MarketauxClient("token", base_url=stub.url))
+    urls = [a["url"] for a in service.get("INFY.NS")]
+    assert urls == ["https://a", "https://b", None, None]
@@ -0,0 +1,58 @@
+# frontend/utils/data.py
+"""
+Cached market data loaders shared by app.py and every page.
+
+Streamlit keys st.cache_data on the function arguments, so each loader is
+cached per (ticker, range, interval) across all sessions. `ttl` bounds how
+stale a chart can get and `max_entries` bounds memory across many sessions.
+"""
+import streamlit as st
+import yfinance as yf
+
+from utils.fundamentals import FundamentalsStore
+
+PRICE_TTL = 3600       # daily candles, refreshed hourly
+MAX_ENTRIES = 256      # per loader, oldest entries are evicted first
+
+
+@st.cache_data(ttl=PRICE_TTL, max_entries=MAX_ENTRIES, show_spinner=False)
+def load_prices(ticker, period=None, start=None, end=None, interval="1d"):
+    """
+    Download OHLCV either by `period` ("1y", "3y", ...) or by start/end dates.
+    Returns: DataFrame indexed by date with single-level columns (may be empty)
+    """
+    if period:
+        df = yf.download(ticker, period=period, interval=interval, progress=False)
+    else:
+        df = yf.download(ticker, start=start, end=end, interval=interval, progress=False)
+    if df is not None and df.columns.nlevels > 1:
+        df.columns = df.columns.get_level_values(0)  # ("Close", "AAPL") -> "Close"
+    return df
+
+
+@st.cache_data(ttl=PRICE_TTL, max_entries=MAX_ENTRIES, show_spinner=False)
+def load_history(ticker, period="1y", interval="1d"):
+    """Same as yf.Ticker(ticker).history (tz-aware index)."""
+    return yf.Ticker(ticker).history(period=period, interval=interval)
+
+
+@st.cache_resource
+def get_fundamentals_store():
+    """One snapshot table per process, shared by all sessions."""
+    return FundamentalsStore()
+
+
+def get_stock_data(ticker, period="1y"):
+    """
+    Returns: (info, hist) or (None, None) when the ticker has no price data.
+    info is today's fundamentals snapshot, not a live yf.Ticker(...).info call.
+    st.cache_data hands back a fresh copy, so callers may add columns to hist.
+    """
+    try:
+        info = get_fundamentals_store().get(ticker)
+        hist = load_history(ticker, period=period)
+        if not info or info.get('regularMarketPrice') is None or hist.empty:
+            return None, None
+        return info, hist
+    except:
+        return None, None
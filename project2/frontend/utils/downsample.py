@@ -0,0 +1,70 @@
+# frontend/utils/downsample.py
+"""
+Shrink long price series before they are sent to Plotly.
+
+lttb() keeps the visual shape of line traces (Largest-Triangle-Three-Buckets),
+resample_ohlc() turns daily candles into weekly/monthly ones, and
+pick_candle_rule() chooses the finest of those that fits the point budget.
+"""
+import numpy as np
+
+POINT_BUDGET = 1500  # max points per trace sent to the browser
+
+# every bar is labelled with the first day of its period, like the daily candles
+CANDLE_RULES = (("D", None), ("W", "W-MON"), ("M", "MS"), ("Q", "QS"))
+CANDLE_NAMES = {"D": "daily", "W": "weekly", "M": "monthly", "Q": "quarterly"}
+
+
+def lttb(series, n_out=POINT_BUDGET):
+    """
+    series: pandas Series indexed by date (NaNs are dropped first)
+    Returns: Series with at most n_out points, first and last always kept
+    """
+    s = series.dropna()
+    n = len(s)
+    if n <= n_out or n_out < 3:
+        return s
+
+    x = s.index.values.astype("datetime64[ns]").astype(np.int64).astype(float)
+    y = s.values.astype(float)
+
+    # interior points are split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        # average of the next bucket (or the last point) is the third vertex
+        if b + 2 < len(edges):
+            nlo, nhi = edges[b + 1], edges[b + 2]
+            cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        keep[b + 1] = a
+    return s.iloc[keep]
+
+
+def resample_ohlc(df, rule):
+    """Aggregate daily OHLCV candles to `rule` (pandas offset, e.g. "W-MON"), labelled by period start."""
+    agg = {"Open": "first", "High": "max", "Low": "min", "Close": "last"}
+    if "Volume" in df.columns:
+        agg["Volume"] = "sum"
+    return (df[list(agg)].resample(rule, label="left", closed="left")
+            .agg(agg).dropna(subset=["Close"]))
+
+
+def pick_candle_rule(index, budget=POINT_BUDGET):
+    """
+    Returns: (label, pandas rule) of the finest candle size whose bar count fits
+    the budget; rule is None when daily data already fits.
+    """
+    days = (index[-1] - index[0]).days + 1 if len(index) else 0
+    per_bar = {"D": 1, "W": 7, "M": 30, "Q": 91}
+    for label, rule in CANDLE_RULES:
+        bars = len(index) if rule is None else days / per_bar[label]
+        if bars <= budget:
+            return label, rule
+    return CANDLE_RULES[-1]
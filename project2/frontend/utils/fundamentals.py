@@ -0,0 +1,185 @@
+# frontend/utils/fundamentals.py
+"""
+Daily fundamentals snapshots, so pages stop calling yf.Ticker(...).info.
+
+FundamentalsStore keeps one row per ticker (as_of date + the fields the
+decision pages score) in a small CSV table. Rows older than today are
+refreshed in bulk by refresh(), either from a background thread started by
+the pages or from cron:
+
+    python -m utils.fundamentals RELIANCE.NS TCS.NS ...
+
+score_fundamentals() scores a whole table with column operations.
+"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import yfinance as yf
+
+FIELDS = ["shortName", "regularMarketPrice", "trailingPE", "priceToBook",
+          "debtToEquity", "returnOnEquity", "trailingEps"]
+NUMERIC_FIELDS = FIELDS[1:]
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+DEFAULT_PATH = os.path.join(DATA_DIR, "fundamentals.csv")
+
+
+def fetch_snapshot(ticker):
+    """Returns: dict of FIELDS for one ticker, or None when yfinance has no quote."""
+    try:
+        info = yf.Ticker(ticker).info
+    except Exception:
+        return None
+    if info.get('regularMarketPrice') is None:
+        return None
+    return {f: info.get(f) for f in FIELDS}
+
+
+class FundamentalsStore:
+    def __init__(self, path=DEFAULT_PATH, max_workers=8, fetch=fetch_snapshot):
+        self.path = path
+        self.max_workers = max_workers
+        self.fetch = fetch
+        self._lock = threading.Lock()
+        self._refresher = None
+        self._inflight = {}  # ticker -> Event set when the batch fetching it is done
+        self._table = self._load()
+
+    # ---------- table ----------
+    def _load(self):
+        if os.path.exists(self.path):
+            df = pd.read_csv(self.path, index_col="ticker", dtype={"shortName": str, "as_of": str})
+        else:
+            df = pd.DataFrame(columns=["as_of"] + FIELDS, index=pd.Index([], name="ticker"))
+        df[NUMERIC_FIELDS] = df[NUMERIC_FIELDS].astype(float)
+        return df
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        self._table.to_csv(tmp, index_label="ticker")
+        os.replace(tmp, self.path)
+
+    def table(self, tickers=None):
+        """Returns: copy of the snapshot table (rows for `tickers` only, in that order)."""
+        with self._lock:
+            df = self._table if tickers is None else self._table.reindex(tickers)
+            return df.dropna(subset=["regularMarketPrice"]).copy()
+
+    def get(self, ticker):
+        """
+        Returns: info-style dict (missing values omitted) or None.
+        A missing or stale ticker is fetched on the spot.
+        """
+        if self.stale([ticker]):
+            self.refresh([ticker])
+        df = self.table([ticker])
+        if df.empty:
+            return None
+        row = df.iloc[0]
+        # missing fields are left out, like yfinance does, so info.get(k, default) works
+        return {f: float(row[f]) if f in NUMERIC_FIELDS else row[f]
+                for f in FIELDS if not pd.isna(row[f])}
+
+    # ---------- refresh ----------
+    def stale(self, tickers):
+        today = pd.Timestamp.today().strftime("%Y-%m-%d")
+        with self._lock:
+            as_of = self._table["as_of"].reindex(tickers)
+        return [t for t, d in as_of.items() if d != today]
+
+    def refresh(self, tickers, force=False):
+        """
+        Fetch snapshots for stale tickers in parallel and write them in one go.
+        Tickers another refresh is already fetching are waited for, not fetched again.
+        Returns: number of tickers this call found a snapshot for
+        """
+        todo = list(tickers) if force else self.stale(tickers)
+        if not todo:
+            return 0
+        done = threading.Event()
+        with self._lock:
+            waits = {self._inflight[t] for t in todo if t in self._inflight}
+            mine = [t for t in todo if t not in self._inflight]
+            for t in mine:
+                self._inflight[t] = done
+        try:
+            written = self._fetch_rows(mine) if mine else 0
+        finally:
+            with self._lock:
+                for t in mine:
+                    self._inflight.pop(t, None)
+            done.set()
+        for event in waits:
+            event.wait()
+        return written
+
+    def _fetch_rows(self, todo):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            snapshots = dict(zip(todo, pool.map(self.fetch, todo)))
+        # tickers without a quote get a dated empty row (NaN price, hidden by
+        # table()) so they are retried the next day instead of on every call
+        rows = {t: s for t, s in snapshots.items() if s}
+        today = pd.Timestamp.today().strftime("%Y-%m-%d")
+        new = pd.DataFrame.from_dict(rows, orient="index").reindex(index=todo, columns=FIELDS)
+        new.index.name = "ticker"
+        new.insert(0, "as_of", today)
+        new[NUMERIC_FIELDS] = new[NUMERIC_FIELDS].apply(pd.to_numeric, errors="coerce").astype(float)
+        with self._lock:
+            self._table = pd.concat([self._table.drop(new.index, errors="ignore"), new])
+            self._save()
+        return len(rows)
+
+    def start_background_refresh(self, tickers, interval=3600):
+        """Keep `tickers` at most one day old from a daemon thread."""
+        if self._refresher is not None:
+            return
+
+        def loop():
+            while True:
+                try:
+                    self.refresh(tickers)
+                except Exception:
+                    pass
+                time.sleep(interval)
+
+        self._refresher = threading.Thread(target=loop, name="fundamentals-refresh", daemon=True)
+        self._refresher.start()
+
+
+def _fmt(values, fmt):
+    return values.map(lambda v: fmt(v) if pd.notna(v) and v else "N/A")
+
+
+def score_fundamentals(df):
+    """
+    df: snapshot table (one row per ticker)
+    Returns: (scores Series, reasons DataFrame) with the same rules as analyze_fundamentals
+    """
+    pe, pb = df["trailingPE"], df["priceToBook"]
+    de, roe, eps = df["debtToEquity"], df["returnOnEquity"], df["trailingEps"]
+
+    scores = (((pe > 0) & (pe < 25)).astype(int)
+              + ((pb > 0) & (pb < 3)).astype(int)
+              + ((de != 0) & (de < 100)).astype(int)
+              + (roe > 0.15).astype(int)
+              + (eps > 0).astype(int))
+
+    reasons = pd.DataFrame({
+        'P/E Ratio': _fmt(pe, lambda v: f"{v:.2f}"),
+        'P/B Ratio': _fmt(pb, lambda v: f"{v:.2f}"),
+        'Debt/Equity': _fmt(de, lambda v: f"{v/100:.2f}"),
+        'Return on Equity': _fmt(roe, lambda v: f"{v:.2%}"),
+        'EPS': _fmt(eps, lambda v: f"{v:.2f}"),
+    }, index=df.index)
+    return scores, reasons
+
+
+if __name__ == "__main__":
+    store = FundamentalsStore()
+    n = store.refresh(sys.argv[1:], force=True)
+    print(f"refreshed {n}/{len(sys.argv) - 1} tickers -> {store.path}")
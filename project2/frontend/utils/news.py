@@ -0,0 +1,169 @@
+# frontend/utils/news.py
+"""
+News service shared by every Streamlit session.
+
+NewsService keeps a TTL cache keyed by (symbols, limit), lets concurrent
+sessions asking for the same key wait on one upstream call, drops duplicate
+articles by URL and can keep the trending feed warm from a background thread.
+The upstream client is pluggable; MarketauxClient takes a base_url so tests
+can point it at a local stub server.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+MARKETAUX_URL = "https://api.marketaux.com/v1/news/all"
+
+
+class NewsFetchError(Exception):
+    pass
+
+
+class MarketauxClient:
+    def __init__(self, api_token, base_url=MARKETAUX_URL, timeout=10, session=None):
+        self.api_token = api_token
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = session or requests.Session()
+
+    def fetch(self, symbols=None, limit=20):
+        """
+        symbols: comma separated tickers or None for trending news
+        Returns: list of article dicts
+        """
+        params = {
+            "api_token": self.api_token,
+            "language": "en",
+            "limit": limit
+        }
+        if symbols:
+            params["symbols"] = symbols
+        try:
+            response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            raise NewsFetchError(f"Network error: {e}")
+        if response.status_code != 200:
+            raise NewsFetchError(f"Error fetching news: {response.status_code} - {response.text}")
+        try:
+            return response.json().get("data", [])
+        except ValueError as e:  # requests.JSONDecodeError, e.g. an HTML error page
+            raise NewsFetchError(f"Invalid news response: {e}")
+
+
+def dedupe_articles(articles):
+    """Keep the first article for each URL (articles without a URL are kept)."""
+    seen = set()
+    out = []
+    for a in articles:
+        url = a.get("url")
+        if url:
+            if url in seen:
+                continue
+            seen.add(url)
+        out.append(a)
+    return out
+
+
+class NewsService:
+    def __init__(self, client, ttl=300, max_entries=256, failure_ttl=10):
+        self.client = client
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.max_entries = max_entries
+        self._cache = OrderedDict()  # key -> (fetched_at, articles)
+        self._failures = {}          # key -> (failed_at, NewsFetchError)
+        self._inflight = {}          # key -> {"done": Event, "error": NewsFetchError | None}
+        self._lock = threading.Lock()
+        self._prefetcher = None
+
+    @staticmethod
+    def _key(symbols, limit):
+        if symbols:
+            symbols = ",".join(sorted({s.strip().upper() for s in symbols.split(",") if s.strip()}))
+        return (symbols or None, int(limit))
+
+    def get(self, symbols=None, limit=20):
+        """
+        Returns: deduplicated article list, from cache when younger than ttl.
+        Raises NewsFetchError when the upstream call fails and nothing is cached.
+        Concurrent callers share one upstream call, and a failure is remembered
+        for failure_ttl seconds so a struggling upstream is not hit by everyone.
+        """
+        key = self._key(symbols, limit)
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit and time.time() - hit[0] < self.ttl:
+                self._cache.move_to_end(key)
+                return hit[1]
+            failed = self._failures.get(key)
+            if failed and time.time() - failed[0] < self.failure_ttl:
+                if hit:
+                    return hit[1]  # serve stale data over an error
+                raise failed[1]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                # this caller does the upstream request for everyone
+                flight = self._inflight[key] = {"done": threading.Event(), "error": None}
+
+        if leader:
+            self._fetch(key, flight)
+        else:
+            flight["done"].wait()
+
+        with self._lock:
+            fresh = self._cache.get(key)
+        if flight["error"] is None and fresh:
+            return fresh[1]
+        if hit:
+            return hit[1]
+        raise flight["error"] or NewsFetchError("news fetch failed")
+
+    def _fetch(self, key, flight):
+        try:
+            articles = dedupe_articles(self.client.fetch(key[0], key[1]))
+        except Exception as e:
+            err = e if isinstance(e, NewsFetchError) else NewsFetchError(f"Error fetching news: {e}")
+            with self._lock:
+                flight["error"] = err
+                self._failures[key] = (time.time(), err)
+                self._inflight.pop(key, None)
+            flight["done"].set()
+            return
+        with self._lock:
+            self._cache[key] = (time.time(), articles)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            self._failures.pop(key, None)
+            self._inflight.pop(key, None)
+        flight["done"].set()
+
+    def invalidate(self, symbols=None, limit=20):
+        with self._lock:
+            self._cache.pop(self._key(symbols, limit), None)
+
+    def start_prefetch(self, limit=20, interval=None):
+        """Refresh the trending feed in a daemon thread so page loads hit the cache."""
+        if self._prefetcher is not None:
+            return
+        interval = interval or max(self.ttl / 2, 1)
+        key = self._key(None, limit)
+
+        def loop():
+            while True:
+                try:
+                    with self._lock:
+                        flight = None
+                        if key not in self._inflight:
+                            flight = self._inflight[key] = {"done": threading.Event(), "error": None}
+                    if flight:
+                        self._fetch(key, flight)
+                except Exception:
+                    pass  # never let one bad refresh stop the prefetcher
+                time.sleep(interval)
+
+        self._prefetcher = threading.Thread(target=loop, name="news-prefetch", daemon=True)
+        self._prefetcher.start()